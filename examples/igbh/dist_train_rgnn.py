@@ -13,17 +13,20 @@
 # limitations under the License.
 # ==============================================================================
 
-import argparse, datetime
+import argparse, datetime, glob, os
 import os.path as osp
 import time, tqdm
 
+from concurrent.futures import ThreadPoolExecutor
+
 import graphlearn_torch as glt
-import numpy as np
-import sklearn.metrics
 import torch
 import torch.distributed
 import torch.nn.functional as F
 
+from torch.distributed.algorithms.ddp_comm_hooks import (
+  default_hooks, powerSGD_hook
+)
 from torch.nn.parallel import DistributedDataParallel
 
 from rgnn import RGNN
@@ -32,23 +35,67 @@ from rgnn import RGNN
 torch.manual_seed(42)
 
 
-def evaluate(model, dataloader):
-  predictions = []
-  labels = []
-  with torch.no_grad():
+def evaluate(model, dataloader, current_device, amp_dtype=None):
+  # Accumulate on device so that only one sync happens per evaluation.
+  correct = torch.zeros((), dtype=torch.long, device=current_device)
+  total = 0
+  with torch.no_grad(), torch.autocast(device_type=current_device.type,
+                                       dtype=amp_dtype,
+                                       enabled=amp_dtype is not None):
     for batch in dataloader:
       batch_size = batch['paper'].batch_size
       out = model(batch.x_dict, batch.edge_index_dict)[:batch_size]
-      labels.append(batch['paper'].y[:batch_size].cpu().numpy())
-      predictions.append(out.argmax(1).cpu().numpy())
+      correct += (out.argmax(1) == batch['paper'].y[:batch_size]).sum()
+      total += batch_size
+  return correct.item() / max(total, 1)
+
+def parse_cpulist(cpulist):
+  cpus = set()
+  for part in cpulist.strip().split(','):
+    if not part:
+      continue
+    if '-' in part:
+      start, end = part.split('-')
+      cpus.update(range(int(start), int(end) + 1))
+    else:
+      cpus.add(int(part))
+  return cpus
+
+def bind_numa_node(local_proc_rank, num_training_procs):
+  r""" Bind the current process to the cpus of one NUMA node, training
+  processes are spread evenly over all NUMA nodes of this machine. Returns
+  the bound NUMA node, or None if the topology is unavailable.
+  """
+  node_dirs = sorted(
+    glob.glob('/sys/devices/system/node/node[0-9]*'),
+    key=lambda d: int(osp.basename(d)[len('node'):])
+  )
+  node_cpus = []
+  for node_dir in node_dirs:
+    with open(osp.join(node_dir, 'cpulist')) as f:
+      cpus = parse_cpulist(f.read()) & os.sched_getaffinity(0)
+    if cpus:
+      node_cpus.append(cpus)
+  if len(node_cpus) < 2:
+    return None
+  procs_per_numa = max(1, -(-num_training_procs // len(node_cpus)))
+  numa_node = min(local_proc_rank // procs_per_numa, len(node_cpus) - 1)
+  os.sched_setaffinity(0, node_cpus[numa_node])
+  return numa_node
 
-    predictions = np.concatenate(predictions)
-    labels = np.concatenate(labels)
-    acc = sklearn.metrics.accuracy_score(labels, predictions)
-    return acc
+def grouped_shuffle(seeds, buckets, batch_size):
+  r""" Shuffle seeds within their buckets and keep seeds of the same bucket
+  together, then shuffle the order of the full batches.
+  """
+  perm = torch.randperm(seeds.size(0))
+  seeds = seeds[perm][torch.argsort(buckets[perm], stable=True)]
+  num_full = seeds.size(0) // batch_size * batch_size
+  batches = seeds[:num_full].view(-1, batch_size)
+  batches = batches[torch.randperm(batches.size(0))].view(-1)
+  return torch.cat([batches, seeds[num_full:]])
 
 def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
-    hidden_channels, num_classes, num_layers, model_type, num_heads, fan_out,
+    hidden_channels, num_classes, num_layers, model_type, num_heads, num_neighbors,
     epochs, batch_size, learning_rate, log_every,
     dataset, train_idx, val_idx, test_idx,
     master_addr,
@@ -57,7 +104,22 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
     val_loader_master_port,
     test_loader_master_port,
     with_gpu,
-    rpc_timeout):
+    rpc_timeout,
+    fused_rgcn,
+    ddp_comm_hook,
+    channel_size,
+    expandable_segments,
+    amp_dtype,
+    timing,
+    numa_bind,
+    compile_model,
+    group_seeds):
+  # `sched_setaffinity` only binds the calling thread, threads inherit the
+  # affinity when they are created. Bind before initializing any group, so
+  # that the RPC, communication and sampling threads or processes are bound.
+  if numa_bind:
+    bind_numa_node(local_proc_rank, num_training_procs)
+
   # Initialize graphlearn_torch distributed worker group context.
   glt.distributed.init_worker_group(
     world_size=num_nodes*num_training_procs,
@@ -81,12 +143,23 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
 
   # Create distributed neighbor loader for training
   train_idx = train_idx.split(train_idx.size(0) // num_training_procs)[local_proc_rank]
+  # Copy the seed slice out of the shared tensor, its pages are first touched
+  # after binding and thus allocated on the local NUMA node.
+  if numa_bind:
+    train_idx = train_idx.clone()
+  if group_seeds:
+    # Seeds of a batch owned by the same partition are sampled with fewer
+    # remote requests. The loader shares `train_idx` with its sampling
+    # workers, so it is reshuffled in place before every epoch.
+    train_seeds, seeds_batch_size = train_idx, batch_size
+    train_buckets = dataset.node_pb['paper'][train_seeds]
+    train_idx = grouped_shuffle(train_seeds, train_buckets, seeds_batch_size)
   train_loader = glt.distributed.DistNeighborLoader(
     data=dataset,
-    num_neighbors=[int(fanout) for fanout in fan_out.split(',')],
+    num_neighbors=num_neighbors,
     input_nodes=('paper', train_idx),
     batch_size=batch_size,
-    shuffle=True,
+    shuffle=not group_seeds,
     drop_last=False,
     collect_features=True,
     to_device=current_device,
@@ -96,16 +169,19 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
       worker_concurrency=2,
       master_addr=master_addr,
       master_port=train_loader_master_port,
-      channel_size='2GB',
+      channel_size=channel_size,
       pin_memory=True if with_gpu else False,
       rpc_timeout=rpc_timeout,
     )
   )
   # Create distributed neighbor loader for validation.
+  # The collocated val/test samplers run on `current_device`, keep their seeds
+  # there so that gathering each seed batch does not need a H2D copy.
   val_idx = val_idx.split(val_idx.size(0) // num_training_procs)[local_proc_rank]
+  val_idx = val_idx.to(current_device)
   val_loader = glt.distributed.DistNeighborLoader(
     data=dataset,
-    num_neighbors=[int(fanout) for fanout in fan_out.split(',')],
+    num_neighbors=num_neighbors,
     input_nodes=('paper', val_idx),
     batch_size=batch_size,
     shuffle=False,
@@ -120,9 +196,10 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
 
   # Create distributed neighbor loader for testing.
   test_idx = test_idx.split(test_idx.size(0) // num_training_procs)[local_proc_rank]
+  test_idx = test_idx.to(current_device)
   test_loader = glt.distributed.DistNeighborLoader(
     data=dataset,
-    num_neighbors=[int(fanout) for fanout in fan_out.split(',')],
+    num_neighbors=num_neighbors,
     input_nodes=('paper', test_idx),
     batch_size=batch_size,
     shuffle=False,
@@ -138,6 +215,11 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
   # Define model and optimizer.
   if with_gpu:
     torch.cuda.set_device(current_device)
+    # Enabled only after all loaders are created, so that the sampling
+    # workers and the cuda IPC handles shared with them keep using the
+    # default allocator.
+    if expandable_segments:
+      torch.cuda.memory._set_allocator_settings('expandable_segments:True')
   model = RGNN(dataset.get_edge_types(),
                dataset.node_features['paper'].shape[1],
                hidden_channels,
@@ -146,10 +228,47 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
                dropout=0.2,
                model=model_type,
                heads=num_heads,
-               node_type='paper').to(current_device)
+               node_type='paper',
+               fused_rgcn=fused_rgcn).to(current_device)
+  # Run one warm-up step without DDP to check whether every parameter gets a
+  # gradient, in which case DDP can skip searching for unused parameters in
+  # each backward and reuse the static autograd graph. This only holds while
+  # every batch contains all edge types, which is checked for each training
+  # batch below.
+  num_edge_types = len(dataset.get_edge_types())
+  batch = next(iter(val_loader))
+  model(batch.x_dict, batch.edge_index_dict).sum().backward()
+  all_used = torch.tensor(
+    int(len(batch.edge_index_dict) == num_edge_types and
+        all(p.grad is not None for p in model.parameters())),
+    device=current_device
+  )
+  torch.distributed.all_reduce(all_used, op=torch.distributed.ReduceOp.MIN)
+  all_used = bool(all_used.item())
+  model.zero_grad(set_to_none=True)
   model = DistributedDataParallel(model,
                                   device_ids=[current_device.index] if with_gpu else None,
-                                  find_unused_parameters=True)
+                                  find_unused_parameters=not all_used,
+                                  static_graph=all_used,
+                                  gradient_as_bucket_view=True)
+  if ddp_comm_hook == 'fp16':
+    model.register_comm_hook(None, default_hooks.fp16_compress_hook)
+  elif ddp_comm_hook == 'bf16':
+    model.register_comm_hook(None, default_hooks.bf16_compress_hook)
+  elif ddp_comm_hook == 'powersgd':
+    # Rank-1 low-rank gradients after a warm-up of plain allreduce steps.
+    state = powerSGD_hook.PowerSGDState(process_group=None,
+                                        matrix_approximation_rank=1,
+                                        start_powerSGD_iter=100)
+    model.register_comm_hook(state, powerSGD_hook.powerSGD_hook)
+  if compile_model:
+    # Split the compiled graph at DDP bucket boundaries, so that gradient
+    # allreduce still overlaps with backward.
+    torch._dynamo.config.optimize_ddp = True
+    # The number of sampled nodes and edges differs in every batch, compile
+    # with dynamic shapes instead of recompiling or re-recording cuda graphs
+    # for each new shape.
+    model = torch.compile(model, dynamic=True)
 
   param_size = 0
   for param in model.parameters():
@@ -163,45 +282,62 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
 
   loss_fcn = torch.nn.CrossEntropyLoss().to(current_device)
   optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+  amp_dtype = {
+    'fp32': None, 'bf16': torch.bfloat16, 'fp16': torch.float16
+  }[amp_dtype]
+  # Loss scaling is only needed for the narrow exponent range of fp16.
+  scaler = torch.cuda.amp.GradScaler(enabled=(amp_dtype == torch.float16))
 
   best_accuracy = 0
   training_start = time.time()
   for epoch in tqdm.tqdm(range(epochs)):
     model.train()
-    total_loss = 0
-    train_acc = 0
-    idx = 0
-    gpu_mem_alloc = 0
+    # Accumulate on device to avoid a device sync in every iteration.
+    total_loss = torch.zeros((), device=current_device)
+    train_correct = torch.zeros((), dtype=torch.long, device=current_device)
+    train_total = 0
     epoch_start = time.time()
+    if group_seeds and epoch > 0:
+      train_idx.copy_(
+        grouped_shuffle(train_seeds, train_buckets, seeds_batch_size))
     for batch in train_loader:
-      idx += 1
+      if all_used and len(batch.edge_index_dict) != num_edge_types:
+        raise RuntimeError(
+          f"a training batch only contains {len(batch.edge_index_dict)} of "
+          f"{num_edge_types} edge types, the parameters of the missing edge "
+          f"types are unused, which is not supported by the static graph of "
+          f"DDP chosen from the warm-up batch")
       batch_size = batch['paper'].batch_size
-      out = model(batch.x_dict, batch.edge_index_dict)[:batch_size]
       y = batch['paper'].y[:batch_size]
-      loss = loss_fcn(out, y)
+      with torch.autocast(device_type=current_device.type, dtype=amp_dtype,
+                          enabled=amp_dtype is not None):
+        out = model(batch.x_dict, batch.edge_index_dict)[:batch_size]
+        loss = loss_fcn(out, y)
       optimizer.zero_grad()
-      loss.backward()
-      optimizer.step()
-      total_loss += loss.item()
-      train_acc += sklearn.metrics.accuracy_score(y.cpu().numpy(),
-          out.argmax(1).detach().cpu().numpy())*100
-      gpu_mem_alloc += (
+      scaler.scale(loss).backward()
+      scaler.step(optimizer)
+      scaler.update()
+      total_loss += loss.detach()
+      train_correct += (out.argmax(1) == y).sum()
+      train_total += batch_size
+    # DDP already synchronizes gradients in backward, so the only barrier
+    # left is the one at the end of a logged epoch, which is also the only
+    # place where the accumulated scalars are copied to host.
+    if epoch%log_every == 0:
+      total_loss = total_loss.item()
+      train_acc = train_correct.item() / max(train_total, 1) * 100
+      gpu_mem_alloc = (
           torch.cuda.max_memory_allocated() / 1000000
           if with_gpu
           else 0
       )
-    train_acc /= idx
-    gpu_mem_alloc /= idx
-    if with_gpu:
-      torch.cuda.synchronize()
-      torch.distributed.barrier()
-    if epoch%log_every == 0:
       model.eval()
-      val_acc = evaluate(model, val_loader).item()*100
+      val_acc = evaluate(model, val_loader, current_device, amp_dtype)*100
       if best_accuracy < val_acc:
         best_accuracy = val_acc
       if with_gpu:
-        torch.cuda.synchronize()
+        if timing:
+          torch.cuda.synchronize()
         torch.distributed.barrier()
       tqdm.tqdm.write(
           "Rank{:02d} | Epoch {:03d} | Loss {:.4f} | Train Acc {:.2f} | Val Acc {:.2f} | Time {} | GPU {:.1f} MB".format(
@@ -216,7 +352,7 @@ def run_training_proc(local_proc_rank, num_nodes, node_rank, num_training_procs,
       )
 
   model.eval()
-  test_acc = evaluate(model, test_loader).item()*100
+  test_acc = evaluate(model, test_loader, current_device, amp_dtype)*100
   print("Rank {:02d} Test Acc {:.2f}%".format(current_ctx.rank, test_acc))
   print("Total time taken " + str(datetime.timedelta(seconds = int(time.time() - training_start))))
 
@@ -237,6 +373,12 @@ if __name__ == '__main__':
   # Model
   parser.add_argument('--model', type=str, default='rgat',
                       choices=['rgat', 'rsage'])
+  parser.add_argument('--compile', action='store_true',
+      help='compile the model with torch.compile, requires PyTorch>=2.0')
+  parser.add_argument('--fused_rgcn', type=str, default='none',
+      choices=['none', 'low_mem', 'high_mem'],
+      help='fuse per-relation convs of rsage into one RGCN kernel per layer, '
+           'low_mem: grouped GEMM, high_mem: per-edge weight gather')
   # Model parameters
   parser.add_argument('--fan_out', type=str, default='10,15')
   parser.add_argument('--batch_size', type=int, default=512)
@@ -246,6 +388,10 @@ if __name__ == '__main__':
   parser.add_argument('--num_layers', type=int, default=6)
   parser.add_argument('--num_heads', type=int, default=4)
   parser.add_argument('--log_every', type=int, default=5)
+  parser.add_argument('--amp_dtype', type=str, default='fp32',
+      choices=['fp32', 'bf16', 'fp16'],
+      help='autocast dtype for forward passes, fp16 is trained with loss '
+           'scaling and is only supported on GPU')
   # Distributed settings.
   parser.add_argument("--num_nodes", type=int, default=2,
       help="Number of distributed nodes.")
@@ -265,13 +411,42 @@ if __name__ == '__main__':
       help="The port used for RPC initialization across all sampling workers of test loader.")
   parser.add_argument("--cpu_mode", action="store_true",
       help="Only use CPU for sampling and training, default is False.")
+  parser.add_argument("--timing", action="store_true",
+      help="Synchronize cuda streams before logging for accurate wall-clock "
+           "time, default is False.")
+  parser.add_argument("--expandable_segments", action="store_true",
+      help="Use expandable segments in the CUDA caching allocator of training "
+           "processes to reduce fragmentation with variable-size batches, "
+           "requires PyTorch>=2.1.")
+  parser.add_argument("--numa_bind", action="store_true",
+      help="Bind each training process and its sampling workers to one NUMA "
+           "node and keep its training seeds in local memory, default is "
+           "False.")
+  parser.add_argument("--group_seeds", action="store_true",
+      help="Group the training seeds of each batch by their owning "
+           "partition to reduce sampling rpcs, default is False.")
   parser.add_argument("--rpc_timeout", type=int, default=180,
                       help="rpc timeout in seconds")
+  parser.add_argument("--channel_size", type=str, default='2GB',
+      help="Size of the pre-allocated shared-memory channel between sampling "
+           "workers and each training process, pinned once for all batches.")
+  parser.add_argument("--ddp_comm_hook", type=str, default='none',
+      choices=['none', 'fp16', 'bf16', 'powersgd'],
+      help="Compress gradients before DDP allreduce, bf16 requires Ampere+ "
+           "GPUs with NCCL, powersgd reduces the bytes sent by gloo in "
+           "cpu mode.")
   args = parser.parse_args()
   # when set --cpu_mode or GPU is not available, use cpu only mode.
   args.with_gpu = (not args.cpu_mode) and torch.cuda.is_available()
   if args.with_gpu:
     assert(not args.num_training_procs > torch.cuda.device_count())
+  else:
+    assert(args.amp_dtype != 'fp16')
+  if args.compile:
+    assert(hasattr(torch, 'compile'))
+  if not args.with_gpu and args.num_nodes == 1:
+    # All gloo traffic stays on this machine, use the loopback interface.
+    os.environ.setdefault('GLOO_SOCKET_IFNAME', 'lo')
 
   print('--- Loading data partition ...\n')
   data_pidx = args.node_rank % args.num_nodes
@@ -283,24 +458,25 @@ if __name__ == '__main__':
     feature_with_gpu=args.with_gpu,
     whole_node_label_file={'paper': osp.join(args.path, f'{args.dataset_size}-label', 'label.pt')}
   )
-  train_idx = torch.load(
-    osp.join(args.path, f'{args.dataset_size}-train-partitions', f'partition{data_pidx}.pt')
-  )
-  val_idx = torch.load(
-    osp.join(args.path, f'{args.dataset_size}-val-partitions', f'partition{data_pidx}.pt')
-  )
-  test_idx = torch.load(
-    osp.join(args.path, f'{args.dataset_size}-test-partitions', f'partition{data_pidx}.pt')
-  )
-  train_idx.share_memory_()
-  val_idx.share_memory_()
-  test_idx.share_memory_()
+  # Read the three seed splits concurrently, straight from the memory-mapped
+  # files into the shared memory passed to the training processes.
+  with ThreadPoolExecutor(3) as executor:
+    train_idx, val_idx, test_idx = executor.map(
+      lambda split: glt.utils.copy_to_shared_memory(glt.utils.load_tensor(
+        osp.join(args.path, f'{args.dataset_size}-{split}-partitions',
+                 f'partition{data_pidx}.pt'),
+        mmap=True
+      )),
+      ['train', 'val', 'test']
+    )
+
+  num_neighbors = [int(fanout) for fanout in args.fan_out.split(',')]
 
   print('--- Launching training processes ...\n')
   torch.multiprocessing.spawn(
     run_training_proc,
     args=(args.num_nodes, args.node_rank, args.num_training_procs,
-          args.hidden_channels, args.num_classes, args.num_layers, args.model, args.num_heads, args.fan_out,
+          args.hidden_channels, args.num_classes, args.num_layers, args.model, args.num_heads, num_neighbors,
           args.epochs, args.batch_size, args.learning_rate, args.log_every,
           dataset, train_idx, val_idx, test_idx,
           args.master_addr,
@@ -309,7 +485,16 @@ if __name__ == '__main__':
           args.val_loader_master_port,
           args.test_loader_master_port,
           args.with_gpu,
-          args.rpc_timeout),
+          args.rpc_timeout,
+          None if args.fused_rgcn == 'none' else args.fused_rgcn,
+          args.ddp_comm_hook,
+          args.channel_size,
+          args.expandable_segments,
+          args.amp_dtype,
+          args.timing,
+          args.numa_bind,
+          args.compile,
+          args.group_seeds),
     nprocs=args.num_training_procs,
     join=True
   )
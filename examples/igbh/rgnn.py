@@ -16,7 +16,9 @@
 import torch
 import torch.nn.functional as F
 
-from torch_geometric.nn import HeteroConv, GATConv, GCNConv, SAGEConv
+from torch_geometric.nn import (
+  HeteroConv, GATConv, GCNConv, SAGEConv, RGCNConv, FastRGCNConv
+)
 
 
 class RGNN(torch.nn.Module):
@@ -32,30 +34,64 @@ class RGNN(torch.nn.Module):
     model: "rsage" or "rgat".
     heads: Number of multi-head-attentions for GAT.
     node_type: The predict node type for node classification.
+    fused_rgcn: None, "low_mem" or "high_mem". If set, all relations of a
+      layer are computed by one fused RGCN kernel instead of one conv per
+      edge type: "low_mem" uses a grouped GEMM over edge-type sorted
+      segments, "high_mem" gathers one weight matrix per edge. Only
+      supported with "rsage".
 
   """
   def __init__(self, etypes, in_dim, h_dim, out_dim, num_layers=2,
-               dropout=0.2, model='rgat', heads=4, node_type=None):
+               dropout=0.2, model='rgat', heads=4, node_type=None,
+               fused_rgcn=None):
     super().__init__()
     self.node_type = node_type
     if node_type is not None:
       self.lin = torch.nn.Linear(h_dim, out_dim)
 
+    self.fused_rgcn = fused_rgcn
+    if fused_rgcn is not None:
+      assert model == 'rsage'
+      assert fused_rgcn in ['low_mem', 'high_mem']
+      self.etype_to_rel = {etype: i for i, etype in enumerate(etypes)}
+
+    # With a predict node type, relations of a layer whose destination can not
+    # reach `node_type` through the following layers never get a gradient,
+    # skip their convs. The destination types of a layer are also kept as the
+    # outputs of its previous layer, which are the `x_dst` inputs of the convs.
+    # Note that skipped convs are not in the `state_dict`, thus checkpoints
+    # saved with all relations in each layer can not be loaded.
+    layer_etypes = [list(etypes) for _ in range(num_layers)]
+    if node_type is not None:
+      dst_types = {node_type}
+      for i in reversed(range(num_layers)):
+        layer_etypes[i] = [etype for etype in etypes if etype[-1] in dst_types]
+        dst_types = ({etype[0] for etype in layer_etypes[i]} |
+                     {etype[-1] for etype in layer_etypes[i]})
+
     self.convs = torch.nn.ModuleList()
     for i in range(num_layers):
       in_dim = in_dim if i == 0 else h_dim
       h_dim = out_dim if (i == (num_layers - 1) and node_type is None) else h_dim
-      if model == 'rsage':
+      if fused_rgcn == 'low_mem':
+        self.convs.append(RGCNConv(in_dim, h_dim, len(etypes),
+                                   root_weight=False, is_sorted=True))
+      elif fused_rgcn == 'high_mem':
+        self.convs.append(FastRGCNConv(in_dim, h_dim, len(etypes),
+                                       root_weight=False))
+      elif model == 'rsage':
         self.convs.append(HeteroConv({
             etype: SAGEConv(in_dim, h_dim, root_weight=False)
-            for etype in etypes}))
+            for etype in layer_etypes[i]}))
       elif model == 'rgat':
         self.convs.append(HeteroConv({
             etype: GATConv(in_dim, h_dim // heads, heads=heads, add_self_loops=False)
-            for etype in etypes}))
+            for etype in layer_etypes[i]}))
     self.dropout = torch.nn.Dropout(dropout)
 
   def forward(self, x_dict, edge_index_dict):
+    if self.fused_rgcn is not None:
+      return self._fused_forward(x_dict, edge_index_dict)
     for i, conv in enumerate(self.convs):
       x_dict = conv(x_dict, edge_index_dict)
       if i != len(self.convs) - 1:
@@ -65,3 +101,47 @@ class RGNN(torch.nn.Module):
       return self.lin(x_dict[self.node_type])
     else:
       return x_dict
+
+  def _fused_forward(self, x_dict, edge_index_dict):
+    # Flatten the heterogeneous batch into a single node buffer and a single
+    # edge list sorted by relation, so that each layer launches one kernel for
+    # all edge types instead of one per edge type.
+    node_offsets, offset = {}, 0
+    for ntype, x in x_dict.items():
+      node_offsets[ntype] = offset
+      offset += x.size(0)
+    x = torch.cat(list(x_dict.values()), dim=0)
+
+    rel_edge_index, rel_edge_type = [], []
+    for etype, edge_index in sorted(
+        edge_index_dict.items(),
+        key=lambda item: self.etype_to_rel.get(item[0], -1)):
+      src, _, dst = etype
+      # Skip unknown relations and relations whose end node types are not
+      # sampled in this batch.
+      if (etype not in self.etype_to_rel or src not in node_offsets or
+          dst not in node_offsets):
+        continue
+      rel_edge_index.append(torch.stack([edge_index[0] + node_offsets[src],
+                                         edge_index[1] + node_offsets[dst]]))
+      # Filled on device, the relation ids are never copied from host.
+      rel_edge_type.append(torch.full((edge_index.size(1), ),
+                                      self.etype_to_rel[etype],
+                                      dtype=torch.long, device=x.device))
+    if len(rel_edge_index) > 0:
+      edge_index = torch.cat(rel_edge_index, dim=1)
+      edge_type = torch.cat(rel_edge_type)
+    else:
+      edge_index = torch.empty((2, 0), dtype=torch.long, device=x.device)
+      edge_type = torch.empty((0, ), dtype=torch.long, device=x.device)
+
+    for i, conv in enumerate(self.convs):
+      x = conv(x, edge_index, edge_type)
+      if i != len(self.convs) - 1:
+        x = self.dropout(F.leaky_relu(x))
+    if hasattr(self, 'lin'): # for node classification
+      start = node_offsets[self.node_type]
+      return self.lin(x[start:start + x_dict[self.node_type].size(0)])
+    else:
+      return {ntype: x[start:start + x_dict[ntype].size(0)]
+              for ntype, start in node_offsets.items()}
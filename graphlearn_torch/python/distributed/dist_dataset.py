@@ -14,7 +14,7 @@
 # ==============================================================================
 
 from multiprocessing.reduction import ForkingPickler
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, NamedTuple, Optional, Set, Union
 
 import torch
 
@@ -24,7 +24,7 @@ from ..typing import (
   NodeType, EdgeType, TensorDataType,
   PartitionBook, HeteroNodePartitionDict, HeteroEdgePartitionDict
 )
-from ..utils import share_memory
+from ..utils import copy_to_shared_memory, load_tensor, share_memory
 
 
 class DistDataset(Dataset):
@@ -55,6 +55,14 @@ class DistDataset(Dataset):
     self.num_partitions = num_partitions
     self.partition_idx = partition_idx
 
+    # Heterogeneous partition books are packed into a single tensor when the
+    # dataset is shared across processes, keep the packed ones for reusing.
+    self._packed_pbs = {}
+    node_pb = self._unpack_pb('node_pb', node_pb)
+    edge_pb = self._unpack_pb('edge_pb', edge_pb)
+    node_feat_pb = self._unpack_pb('_node_feat_pb', node_feat_pb, node_pb)
+    edge_feat_pb = self._unpack_pb('_edge_feat_pb', edge_feat_pb, edge_pb)
+
     self.node_pb = node_pb
     self.edge_pb = edge_pb
 
@@ -87,6 +95,10 @@ class DistDataset(Dataset):
     r""" Load a certain dataset partition from partitioned files and create
     in-memory objects (``Graph``, ``Feature`` or ``torch.Tensor``).
 
+    The partition files are memory-mapped (PyTorch >= 2.1), thus the raw
+    partition data is only paged in when it is consumed by building the
+    in-memory objects.
+
     Args:
       root_dir (str): The directory path to load the graph and feature
         partition data.
@@ -117,7 +129,7 @@ class DistDataset(Dataset):
       edge_feat_data,
       self.node_pb,
       self.edge_pb
-    ) = load_partition(root_dir, partition_idx)
+    ) = load_partition(root_dir, partition_idx, mmap=True)
 
     # init graph partition
     if isinstance(graph_data, dict):
@@ -135,47 +147,83 @@ class DistDataset(Dataset):
 
     # load node feature partition
     if node_feat_data is not None:
-      node_cache_ratio, node_feat, node_feat_id2idx, node_feat_pb = \
-        _cat_feature_cache(partition_idx, node_feat_data, self.node_pb)
+      node_feat = _cat_feature_cache(partition_idx, node_feat_data,
+                                     self.node_pb)
       self.init_node_features(
-        node_feat, node_feat_id2idx, None, node_cache_ratio,
+        node_feat.data, node_feat.id2idx, None, node_feat.cache_ratio,
         device_group_list, device, feature_with_gpu, dtype=None
       )
-      self._node_feat_pb = node_feat_pb
+      self._node_feat_pb = node_feat.pb
 
     # load edge feature partition
     if edge_feat_data is not None:
-      edge_cache_ratio, edge_feat, edge_feat_id2idx, edge_feat_pb = \
-        _cat_feature_cache(partition_idx, edge_feat_data, self.edge_pb)
+      edge_feat = _cat_feature_cache(partition_idx, edge_feat_data,
+                                     self.edge_pb)
       self.init_edge_features(
-        edge_feat, edge_feat_id2idx, edge_cache_ratio,
+        edge_feat.data, edge_feat.id2idx, edge_feat.cache_ratio,
         device_group_list, device, feature_with_gpu, dtype=None
       )
-      self._edge_feat_pb = edge_feat_pb
+      self._edge_feat_pb = edge_feat.pb
 
-    # load whole node labels
+    # load whole node labels, which are memory-mapped and copied once into
+    # shared memory, as the storages mapped by `torch.load` are reported as
+    # shared and would not be moved into shared memory when the dataset is
+    # shared with other processes.
     if whole_node_label_file is not None:
       if isinstance(whole_node_label_file, dict):
         whole_node_labels = {}
         for ntype, file in whole_node_label_file.items():
-          whole_node_labels[ntype] = torch.load(file)
+          whole_node_labels[ntype] = load_tensor(file, mmap=True)
       else:
-        whole_node_labels = torch.load(whole_node_label_file)
-      self.init_node_labels(whole_node_labels)
+        whole_node_labels = load_tensor(whole_node_label_file, mmap=True)
+      self.init_node_labels(copy_to_shared_memory(whole_node_labels))
 
   def share_ipc(self):
     super().share_ipc()
-    self.node_pb = share_memory(self.node_pb)
-    self.edge_pb = share_memory(self.edge_pb)
-    self._node_feat_pb = share_memory(self._node_feat_pb)
-    self._edge_feat_pb = share_memory(self._edge_feat_pb)
+    # The feature partition books of types without a feature cache are the
+    # same tensors as the graph partition books, which are shared only once.
+    node_feat_aliases = _aliased_types(self._node_feat_pb, self.node_pb)
+    edge_feat_aliases = _aliased_types(self._edge_feat_pb, self.edge_pb)
+    node_pb = self._share_pb('node_pb')
+    edge_pb = self._share_pb('edge_pb')
+    node_feat_pb = self._share_pb('_node_feat_pb', self.node_pb,
+                                  node_feat_aliases)
+    edge_feat_pb = self._share_pb('_edge_feat_pb', self.edge_pb,
+                                  edge_feat_aliases)
     ipc_hanlde = (
       self.num_partitions, self.partition_idx,
       self.graph, self.node_features, self.edge_features, self.node_labels,
-      self.node_pb, self.edge_pb, self._node_feat_pb, self._edge_feat_pb
+      node_pb, edge_pb, node_feat_pb, edge_feat_pb
     )
     return ipc_hanlde
 
+  def _share_pb(self, name: str, base=None, aliases=()):
+    r""" Share a partition book attribute with memory, a heterogeneous one
+    will be packed into a single shared tensor. The entries of ``aliases``
+    are taken from the shared ``base`` partition books rather than packed.
+    """
+    pb = getattr(self, name)
+    packed = self._packed_pbs.get(name, None)
+    if packed is not None and packed.is_packed_from(pb, aliases):
+      return packed
+    if _PackedPartitionBook.packable(pb):
+      packed = _PackedPartitionBook(pb, aliases)
+      self._packed_pbs[name] = packed
+      setattr(self, name, packed.unpack(base))
+      return packed
+    if isinstance(pb, dict) and len(aliases) > 0:
+      pb = {graph_type: base[graph_type] if graph_type in aliases else v
+            for graph_type, v in pb.items()}
+    pb = share_memory(pb)
+    setattr(self, name, pb)
+    return pb
+
+  def _unpack_pb(self, name: str, pb, base=None):
+    if isinstance(pb, _PackedPartitionBook):
+      self._packed_pbs[name] = pb
+      return pb.unpack(base)
+    return pb
+
   @classmethod
   def from_ipc_handle(cls, ipc_handle):
     return cls(*ipc_handle)
@@ -193,20 +241,187 @@ class DistDataset(Dataset):
     return self._edge_feat_pb
 
 
+class _PackedPartitionBook(object):
+  r""" Partition books of all node/edge types packed into a flat tensor,
+  which will be shared with a single shared-memory segment rather than one
+  segment for each type. The partition book of each type is a view of the
+  flat tensor.
+  """
+  def __init__(self, pb_dict: Dict[Union[NodeType, EdgeType], PartitionBook],
+               aliases: Set[Union[NodeType, EdgeType]] = ()):
+    # partition books of aliased types are views of another packed one, only
+    # their types are kept and the views are restored by ``unpack``.
+    self.aliases = set(aliases)
+    self.graph_types = list(pb_dict.keys())
+    self.offsets = {}
+    offset, pb_list = 0, []
+    for graph_type, pb in pb_dict.items():
+      if graph_type in self.aliases:
+        continue
+      self.offsets[graph_type] = (offset, pb.numel())
+      offset += pb.numel()
+      pb_list.append(pb)
+    self.flat_pb = None
+    if len(pb_list) > 0:
+      self.flat_pb = torch.cat(pb_list).share_memory_()
+
+  @staticmethod
+  def packable(pb) -> bool:
+    if not isinstance(pb, dict) or len(pb) == 0:
+      return False
+    dtypes = set()
+    for v in pb.values():
+      if not isinstance(v, torch.Tensor) or v.dim() != 1:
+        return False
+      dtypes.add(v.dtype)
+    return len(dtypes) == 1
+
+  def is_packed_from(self, pb, aliases=()) -> bool:
+    if (not isinstance(pb, dict) or set(aliases) != self.aliases or
+        pb.keys() != set(self.graph_types)):
+      return False
+    for graph_type, (offset, _) in self.offsets.items():
+      v = pb[graph_type]
+      if (not isinstance(v, torch.Tensor) or
+          v.data_ptr() != self.flat_pb[offset:].data_ptr()):
+        return False
+    return True
+
+  def unpack(
+    self,
+    base: Optional[Dict[Union[NodeType, EdgeType], PartitionBook]] = None
+  ) -> Dict[Union[NodeType, EdgeType], PartitionBook]:
+    pb_dict = {}
+    for graph_type in self.graph_types:
+      if graph_type in self.aliases:
+        pb_dict[graph_type] = base[graph_type]
+      else:
+        offset, num = self.offsets[graph_type]
+        pb_dict[graph_type] = self.flat_pb[offset:offset + num]
+    return pb_dict
+
+
+def _aliased_types(pb, base):
+  r""" Types whose partition books in ``pb`` are the same objects as the ones
+  in ``base``.
+  """
+  if not isinstance(pb, dict) or not isinstance(base, dict):
+    return set()
+  return {graph_type for graph_type, v in pb.items()
+          if base.get(graph_type, None) is v}
+
+
+class _CachedFeaturePartition(NamedTuple):
+  r""" A feature partition concatenated with its cached features, each field
+  is a dict keyed by node/edge type for heterogeneous features.
+  """
+  # feature tensor with cached features arranged before partition features
+  data: Union[TensorDataType, Dict[Union[NodeType, EdgeType], TensorDataType]]
+  # mapping from global id to local index in `data`
+  id2idx: Union[TensorDataType, Dict[Union[NodeType, EdgeType], TensorDataType]]
+  # partition book modified for cached ids
+  pb: Union[PartitionBook, Dict[Union[NodeType, EdgeType], PartitionBook]]
+  # proportion of cached features
+  cache_ratio: Union[float, Dict[Union[NodeType, EdgeType], float]]
+
+
 def _cat_feature_cache(partition_idx, raw_feat_data, raw_feat_pb):
   r""" Cat a feature partition with its cached features.
   """
   if isinstance(raw_feat_data, dict):
     # heterogeneous.
-    cache_ratio, feat_data, feat_id2idx, feat_pb = {}, {}, {}, {}
-    for graph_type, raw_feat in raw_feat_data.items():
-      cache_ratio[graph_type], feat_data[graph_type], \
-      feat_id2idx[graph_type], feat_pb[graph_type] = \
-        cat_feature_cache(partition_idx, raw_feat, raw_feat_pb[graph_type])
+    cache_ratio, feat_data, feat_id2idx, feat_pb = \
+      _cat_hetero_feature_cache(partition_idx, raw_feat_data, raw_feat_pb)
   else:
     # homogeneous.
     cache_ratio, feat_data, feat_id2idx, feat_pb = \
       cat_feature_cache(partition_idx, raw_feat_data, raw_feat_pb)
+  return _CachedFeaturePartition(feat_data, feat_id2idx, feat_pb, cache_ratio)
+
+
+def _cat_hetero_feature_cache(partition_idx, raw_feat_data, raw_feat_pb):
+  r""" Cat the feature partitions of all types with their cached features in
+  a batch, which has the same results as calling ``cat_feature_cache`` for
+  each type, but the concatenated features, id2idx and partition books of
+  different types are computed with single kernels and returned as views.
+  """
+  graph_types = list(raw_feat_data.keys())
+  cached_types = [
+    graph_type for graph_type, raw_feat in raw_feat_data.items()
+    if raw_feat.cache_feats is not None and raw_feat.cache_ids is not None
+  ]
+  cache_ratio, feat_data, feat_pb = {}, {}, {}
+  for graph_type in graph_types:
+    cache_ratio[graph_type] = 0.0
+    feat_data[graph_type] = raw_feat_data[graph_type].feats
+    feat_pb[graph_type] = raw_feat_pb[graph_type]
+
+  # cat features, the cached feature data is arranged before the original
+  # partition data of each type.
+  if len(cached_types) > 0:
+    feats_list, num_feats = [], []
+    for graph_type in cached_types:
+      raw_feat = raw_feat_data[graph_type]
+      num_cache, num_ids = raw_feat.cache_ids.size(0), raw_feat.ids.size(0)
+      cache_ratio[graph_type] = num_cache / (num_cache + num_ids)
+      feats_list.extend([raw_feat.cache_feats, raw_feat.feats])
+      num_feats.append(num_cache + num_ids)
+    if (len(set(f.shape[1:] for f in feats_list)) == 1 and
+        len(set(f.dtype for f in feats_list)) == 1):
+      new_feats = torch.split(torch.cat(feats_list), num_feats)
+    else:
+      new_feats = [torch.cat(feats_list[2 * i:2 * i + 2])
+                   for i in range(len(cached_types))]
+    for graph_type, feats in zip(cached_types, new_feats):
+      feat_data[graph_type] = feats
+
+  # compute id2idx of all types with a single flat tensor, where the ids of
+  # each type are shifted by an offset.
+  ids_list, num_ids_list = [], []
+  for graph_type in graph_types:
+    raw_feat = raw_feat_data[graph_type]
+    ids = raw_feat.ids.to(torch.int64)
+    if graph_type in cached_types:
+      cache_ids = raw_feat.cache_ids.to(torch.int64)
+      ids_list.extend([cache_ids, ids])
+      num_ids_list.append(cache_ids.size(0) + ids.size(0))
+    else:
+      ids_list.append(ids)
+      num_ids_list.append(ids.size(0))
+  all_ids = torch.cat(ids_list)
+  device = all_ids.device
+  type_ids = torch.split(all_ids, num_ids_list)
+  id2idx_sizes = (torch.stack([t.max() for t in type_ids]) + 1).tolist()
+  num_ids = torch.tensor(num_ids_list, dtype=torch.int64, device=device)
+  id_offsets = torch.tensor([0] + id2idx_sizes[:-1], dtype=torch.int64,
+                            device=device).cumsum(0)
+  idx_offsets = torch.cat([num_ids.new_zeros(1), num_ids[:-1]]).cumsum(0)
+  all_gids = all_ids + torch.repeat_interleave(id_offsets, num_ids)
+  all_idx = (torch.arange(all_ids.size(0), dtype=torch.int64, device=device) -
+             torch.repeat_interleave(idx_offsets, num_ids))
+  flat_id2idx = torch.zeros(sum(id2idx_sizes), dtype=torch.int64, device=device)
+  # cached ids are arranged before the original partition of each type, so
+  # reducing with `amin` lets them take precedence over duplicated ids.
+  flat_id2idx.scatter_reduce_(0, all_gids, all_idx, reduce='amin',
+                              include_self=False)
+  feat_id2idx = dict(zip(graph_types, torch.split(flat_id2idx, id2idx_sizes)))
+
+  # modify partition books of cached types.
+  if len(cached_types) > 0:
+    pb_list = [raw_feat_pb[graph_type] for graph_type in cached_types]
+    pb_sizes = [pb.numel() for pb in pb_list]
+    flat_pb = torch.cat(pb_list)
+    pb_offsets = [0]
+    for size in pb_sizes[:-1]:
+      pb_offsets.append(pb_offsets[-1] + size)
+    cache_gids = torch.cat([
+      raw_feat_data[graph_type].cache_ids.to(torch.int64).to(flat_pb.device) +
+      offset for graph_type, offset in zip(cached_types, pb_offsets)
+    ])
+    flat_pb[cache_gids] = partition_idx
+    for graph_type, pb in zip(cached_types, torch.split(flat_pb, pb_sizes)):
+      feat_pb[graph_type] = pb
+
   return cache_ratio, feat_data, feat_id2idx, feat_pb
 
 
@@ -18,6 +18,7 @@ from typing import Dict, List, Optional, Tuple, Union
 import torch
 
 from ..data import Feature
+from ..partition import RangePartitionBook
 from ..typing import (
   EdgeType, NodeType,
   PartitionBook, HeteroNodePartitionDict, HeteroEdgePartitionDict
@@ -97,7 +98,7 @@ class DistFeature(object):
     self.feature_pb = feature_pb
     if isinstance(self.feature_pb, dict):
       assert self.data_cls == 'hetero'
-    elif isinstance(self.feature_pb, PartitionBook):
+    elif isinstance(self.feature_pb, (PartitionBook, RangePartitionBook)):
       assert self.data_cls == 'homo'
     else:
       raise ValueError(f"'{self.__class__.__name__}': found invalid input "
@@ -18,6 +18,7 @@ from typing import Dict, Optional, Union
 import torch
 
 from ..data import Graph
+from ..partition import RangePartitionBook
 from ..typing import (
   NodeType, EdgeType, PartitionBook,
   HeteroNodePartitionDict, HeteroEdgePartitionDict
@@ -62,7 +63,7 @@ class DistGraph(object):
     if self.node_pb is not None:
       if isinstance(self.node_pb, dict):
         assert self.data_cls == 'hetero'
-      elif isinstance(self.node_pb, PartitionBook):
+      elif isinstance(self.node_pb, (PartitionBook, RangePartitionBook)):
         assert self.data_cls == 'homo'
       else:
         raise ValueError(f"'{self.__class__.__name__}': found invalid input "
@@ -71,7 +72,7 @@ class DistGraph(object):
     if self.edge_pb is not None:
       if isinstance(self.edge_pb, dict):
         assert self.data_cls == 'hetero'
-      elif isinstance(self.edge_pb, PartitionBook):
+      elif isinstance(self.edge_pb, (PartitionBook, RangePartitionBook)):
         assert self.data_cls == 'homo'
       else:
         raise ValueError(f"'{self.__class__.__name__}': found invalid input "
@@ -133,6 +133,8 @@ class DistLoader(object):
     if not self.drop_last and self._input_len % self.batch_size != 0:
       self._num_expected += 1
     self._num_recv = 0
+    self._non_blocking = False
+    self._pending_msg = None
 
     current_ctx = get_context()
     if current_ctx is None:
@@ -178,6 +180,9 @@ class DistLoader(object):
                                  self.worker_options.channel_size)
       if self.worker_options.pin_memory:
         self._channel.pin_memory()
+        # Sampled messages received from a pinned channel can be copied to
+        # device asynchronously.
+        self._non_blocking = (self.to_device.type == 'cuda')
 
       self._mp_producer = DistMpSamplingProducer(
         self.data, self.input_data, self.sampling_config,
@@ -245,6 +250,7 @@ class DistLoader(object):
 
   def __next__(self):
     if self._num_recv == self._num_expected:
+      self._release_pending_msg()
       raise StopIteration
 
     if self._with_channel:
@@ -253,10 +259,18 @@ class DistLoader(object):
       msg = self._collocated_producer.sample()
 
     result = self._collate_fn(msg)
+    if self._non_blocking:
+      # The tensors of a received message are views of the channel buffer,
+      # which must be kept alive until their async copies are finished.
+      self._release_pending_msg()
+      event = torch.cuda.Event()
+      event.record(torch.cuda.current_stream(self.to_device))
+      self._pending_msg = (msg, event)
     self._num_recv += 1
     return result
 
   def __iter__(self):
+    self._release_pending_msg()
     self._num_recv = 0
     if self._worker_mode == 'collocated':
       self._collocated_producer.reset()
@@ -271,6 +285,15 @@ class DistLoader(object):
       self._channel.reset()
     return self
 
+  def _release_pending_msg(self):
+    if self._pending_msg is not None:
+      _, event = self._pending_msg
+      event.synchronize()
+      self._pending_msg = None
+
+  def _to_device(self, tensor: torch.Tensor) -> torch.Tensor:
+    return tensor.to(self.to_device, non_blocking=self._non_blocking)
+
   def _set_ntypes_and_etypes(self, node_types: List[NodeType],
                              edge_types: List[EdgeType]):
     self._node_types = node_types
@@ -297,7 +320,7 @@ class DistLoader(object):
     for k in msg.keys():
       if k.startswith('#META.'):
         meta_key = str(k[6:])
-        metadata[meta_key] = msg[k].to(self.to_device)
+        metadata[meta_key] = self._to_device(msg[k])
     if len(metadata) == 0:
       metadata = None
 
@@ -309,24 +332,24 @@ class DistLoader(object):
       for ntype in self._node_types:
         ids_key = f'{as_str(ntype)}.ids'
         if ids_key in msg:
-          node_dict[ntype] = msg[ids_key].to(self.to_device)
+          node_dict[ntype] = self._to_device(msg[ids_key])
         nfeat_key = f'{as_str(ntype)}.nfeats'
         if nfeat_key in msg:
-          nfeat_dict[ntype] = msg[nfeat_key].to(self.to_device)
+          nfeat_dict[ntype] = self._to_device(msg[nfeat_key])
 
       for etype_str, rev_etype in self._etype_str_to_rev.items():
         rows_key = f'{etype_str}.rows'
         cols_key = f'{etype_str}.cols'
         if rows_key in msg:
           # The edge index should be reversed.
-          row_dict[rev_etype] = msg[cols_key].to(self.to_device)
-          col_dict[rev_etype] = msg[rows_key].to(self.to_device)
+          row_dict[rev_etype] = self._to_device(msg[cols_key])
+          col_dict[rev_etype] = self._to_device(msg[rows_key])
         eids_key = f'{etype_str}.eids'
         if eids_key in msg:
-          edge_dict[rev_etype] = msg[eids_key].to(self.to_device)
+          edge_dict[rev_etype] = self._to_device(msg[eids_key])
         efeat_key = f'{etype_str}.efeats'
         if efeat_key in msg:
-          efeat_dict[rev_etype] = msg[efeat_key].to(self.to_device)
+          efeat_dict[rev_etype] = self._to_device(msg[efeat_key])
 
       if len(nfeat_dict) == 0:
         nfeat_dict = None
@@ -340,7 +363,7 @@ class DistLoader(object):
         }
         batch_labels_key = f'{self._input_type}.nlabels'
         if batch_labels_key in msg:
-          batch_labels = msg[batch_labels_key].to(self.to_device)
+          batch_labels = self._to_device(msg[batch_labels_key])
         else:
           batch_labels = None
         batch_label_dict = {self._input_type: batch_labels}
@@ -359,18 +382,18 @@ class DistLoader(object):
 
     # Homogeneous sampling results
     else:
-      ids = msg['ids'].to(self.to_device)
-      rows = msg['rows'].to(self.to_device)
-      cols = msg['cols'].to(self.to_device)
-      eids = msg['eids'].to(self.to_device) if 'eids' in msg else None
+      ids = self._to_device(msg['ids'])
+      rows = self._to_device(msg['rows'])
+      cols = self._to_device(msg['cols'])
+      eids = self._to_device(msg['eids']) if 'eids' in msg else None
 
-      nfeats = msg['nfeats'].to(self.to_device) if 'nfeats' in msg else None
-      efeats = msg['efeats'].to(self.to_device) if 'efeats' in msg else None
+      nfeats = self._to_device(msg['nfeats']) if 'nfeats' in msg else None
+      efeats = self._to_device(msg['efeats']) if 'efeats' in msg else None
 
       if self.sampling_config.sampling_type in [SamplingType.NODE,
                                                 SamplingType.SUBGRAPH]:
         batch = ids[:self.batch_size]
-        batch_labels = msg['nlabels'].to(self.to_device) if 'nlabels' in msg else None
+        batch_labels = self._to_device(msg['nlabels']) if 'nlabels' in msg else None
       else:
         batch = None
         batch_labels = None
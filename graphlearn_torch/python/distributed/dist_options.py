@@ -171,7 +171,10 @@ class MpDistSamplingWorkerOptions(_BasicDistSamplingWorkerOptions):
       to ``None``. (default: ``None``).
     pin_memory (bool): Set to ``True`` to register the underlying shared memory
       for cuda, which will achieve better performance if you want to copy
-      loaded data from channel to cuda device. (default: ``False``).
+      loaded data from channel to cuda device. The whole buffer of
+      ``channel_size`` is registered once when the loader is created and then
+      reused by all sampled messages, thus no per-batch pinned allocation is
+      needed. (default: ``False``).
 
   Please ref to ``_BasicDistSamplingWorkerOptions`` for more detailed comments
   of related input arguments.
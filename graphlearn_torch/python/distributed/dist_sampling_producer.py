@@ -279,15 +279,14 @@ class DistCollocatedSamplingProducer(object):
     self.device = device
 
   def init(self):
-    index = torch.arange(len(self.sampler_input))
-
-    self._index_loader = DataLoader(
-      index,
-      batch_size=self.sampling_config.batch_size,
-      shuffle=self.sampling_config.shuffle,
-      drop_last=self.sampling_config.drop_last
-    )
-    self._index_iter = self._index_loader._get_iterator()
+    # The seed indices are generated on the device of the sampler input, thus
+    # gathering the seeds of each batch needs no host-to-device copy when the
+    # input seeds are on the sampling device.
+    if isinstance(self.sampler_input, EdgeSamplerInput):
+      self._index_device = self.sampler_input.row.device
+    else:
+      self._index_device = self.sampler_input.node.device
+    self.reset()
 
     if self.worker_options.num_rpc_threads is None:
       num_rpc_threads = min(self.data.num_partitions, 16)
@@ -314,10 +313,18 @@ class DistCollocatedSamplingProducer(object):
       self._collocated_sampler.shutdown_loop()
 
   def reset(self):
-    self._index_iter._reset(self._index_loader)
+    num_seeds = len(self.sampler_input)
+    if self.sampling_config.shuffle:
+      index = torch.randperm(num_seeds, device=self._index_device)
+    else:
+      index = torch.arange(num_seeds, device=self._index_device)
+    batch_size = self.sampling_config.batch_size
+    if self.sampling_config.drop_last:
+      index = index[:num_seeds // batch_size * batch_size]
+    self._index_iter = iter(torch.split(index, batch_size))
 
   def sample(self):
-    index = self._index_iter._next_data()
+    index = next(self._index_iter)
     batch = self.sampler_input[index]
     if self.sampling_config.sampling_type == SamplingType.NODE:
       return self._collocated_sampler.sample_from_nodes(batch)
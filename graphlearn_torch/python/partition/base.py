@@ -13,9 +13,11 @@
 # limitations under the License.
 # ==============================================================================
 
+import json
 import os
 import pickle
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Union
 
 import torch
@@ -26,7 +28,10 @@ from ..typing import (
   FeaturePartitionData, HeteroFeaturePartitionData,
   PartitionBook, HeteroNodePartitionDict, HeteroEdgePartitionDict
 )
-from ..utils import convert_to_tensor, ensure_dir, id2idx
+from ..utils import (
+  convert_to_tensor, copy_to_shared_memory, ensure_dir, id2idx, is_raw_dtype,
+  load_tensor, load_tensor_raw, save_stacked_tensors_raw, save_tensor_raw
+)
 
 
 def save_meta(
@@ -35,8 +40,12 @@ def save_meta(
   data_cls: str = 'homo',
   node_types: Optional[List[NodeType]] = None,
   edge_types: Optional[List[EdgeType]] = None,
+  empty_feats: Optional[Dict[str, Dict]] = None
 ):
   r""" Save partitioning meta info into the output directory.
+
+  ``empty_feats`` records the feature partitions without any features, which
+  are not saved, see ``_record_empty_feature``.
   """
   meta = {
     'num_parts': num_parts,
@@ -44,8 +53,26 @@ def save_meta(
     'node_types': node_types,
     'edge_types': edge_types
   }
-  with open(os.path.join(output_dir, 'META'), 'wb') as outfile:
-    pickle.dump(meta, outfile, pickle.HIGHEST_PROTOCOL)
+  if empty_feats:
+    meta['empty_feats'] = empty_feats
+  with open(os.path.join(output_dir, 'META'), 'w') as outfile:
+    json.dump(meta, outfile)
+
+
+def load_meta(root_dir: str):
+  r""" Load partitioning meta info from the root directory, edge types are
+  restored as tuples. Pickled meta info of earlier versions is also supported.
+  """
+  meta_path = os.path.join(root_dir, 'META')
+  try:
+    with open(meta_path, 'r') as infile:
+      meta = json.load(infile)
+  except (UnicodeDecodeError, json.JSONDecodeError):
+    with open(meta_path, 'rb') as infile:
+      meta = pickle.load(infile)
+  if meta['edge_types'] is not None:
+    meta['edge_types'] = [tuple(etype) for etype in meta['edge_types']]
+  return meta
 
 
 def save_node_pb(
@@ -58,10 +85,10 @@ def save_node_pb(
   if ntype is not None:
     subdir = os.path.join(output_dir, 'node_pb')
     ensure_dir(subdir)
-    fpath = os.path.join(subdir, f'{as_str(ntype)}.pt')
+    fpath = os.path.join(subdir, f'{as_str(ntype)}.npy')
   else:
-    fpath = os.path.join(output_dir, 'node_pb.pt')
-  torch.save(node_pb, fpath)
+    fpath = os.path.join(output_dir, 'node_pb.npy')
+  save_tensor_raw(node_pb, fpath)
 
 
 def save_edge_pb(
@@ -74,10 +101,13 @@ def save_edge_pb(
   if etype is not None:
     subdir = os.path.join(output_dir, 'edge_pb')
     ensure_dir(subdir)
-    fpath = os.path.join(subdir, f'{as_str(etype)}.pt')
+    fpath = os.path.join(subdir, as_str(etype))
+  else:
+    fpath = os.path.join(output_dir, 'edge_pb')
+  if isinstance(edge_pb, RangePartitionBook):
+    save_tensor_raw(edge_pb.bounds, f'{fpath}.bounds.npy')
   else:
-    fpath = os.path.join(output_dir, 'edge_pb.pt')
-  torch.save(edge_pb, fpath)
+    save_tensor_raw(edge_pb, f'{fpath}.npy')
 
 
 def save_graph_partition(
@@ -92,9 +122,14 @@ def save_graph_partition(
   if etype is not None:
     subdir = os.path.join(subdir, as_str(etype))
   ensure_dir(subdir)
-  torch.save(graph_partition.edge_index[0], os.path.join(subdir, 'rows.pt'))
-  torch.save(graph_partition.edge_index[1], os.path.join(subdir, 'cols.pt'))
-  torch.save(graph_partition.eids, os.path.join(subdir, 'eids.pt'))
+  # rows, cols and eids are int64 tensors of the same size, save them as one
+  # raw tensor without stacking them in memory.
+  save_stacked_tensors_raw(
+    [graph_partition.edge_index[0],
+     graph_partition.edge_index[1],
+     graph_partition.eids],
+    os.path.join(subdir, 'data.npy')
+  )
 
 
 def save_feature_partition(
@@ -102,19 +137,173 @@ def save_feature_partition(
   partition_idx: int,
   feature_partition: FeaturePartitionData,
   group: str = 'node_feat',
-  graph_type: Optional[Union[NodeType, EdgeType]] = None
+  graph_type: Optional[Union[NodeType, EdgeType]] = None,
+  bundle: Optional[Dict[str, torch.Tensor]] = None
 ):
   r""" Save a feature partition into the output directory.
+
+  If ``bundle`` is provided, the feature and cached feature tensors are saved
+  into separate files, and the id tensors will be added into the bundle with
+  keys prefixed by ``_bundle_prefix``, rather than being saved into a separate
+  file, see ``save_partition_bundle``.
   """
   subdir = os.path.join(output_dir, f'part{partition_idx}', group)
   if graph_type is not None:
     subdir = os.path.join(subdir, as_str(graph_type))
   ensure_dir(subdir)
-  torch.save(feature_partition.feats, os.path.join(subdir, 'feats.pt'))
-  torch.save(feature_partition.ids, os.path.join(subdir, 'ids.pt'))
-  if feature_partition.cache_feats is not None:
-    torch.save(feature_partition.cache_feats, os.path.join(subdir, 'cache_feats.pt'))
-    torch.save(feature_partition.cache_ids, os.path.join(subdir, 'cache_ids.pt'))
+  data = {
+    'feats': feature_partition.feats,
+    'ids': feature_partition.ids,
+    'cache_feats': feature_partition.cache_feats,
+    'cache_ids': feature_partition.cache_ids
+  }
+  if bundle is None:
+    # Save the feature tensor as a raw tensor, so that it can be
+    # memory-mapped when loading.
+    if is_raw_dtype(feature_partition.feats.dtype):
+      save_tensor_raw(data.pop('feats'), os.path.join(subdir, 'feats.npy'))
+    torch.save(data, os.path.join(subdir, 'data.pt'))
+    return
+  # Feature tensors are written when they are partitioned rather than being
+  # held by the bundle until all partitions are done.
+  for key in ['feats', 'cache_feats']:
+    value = data.pop(key)
+    if value is None:
+      continue
+    if is_raw_dtype(value.dtype):
+      save_tensor_raw(value, os.path.join(subdir, f'{key}.npy'))
+    else:
+      torch.save(value, os.path.join(subdir, f'{key}.pt'))
+  prefix = _bundle_prefix(group, graph_type)
+  for key, value in data.items():
+    if value is not None:
+      bundle[prefix + key] = value
+
+
+def save_partition_bundle(
+  output_dir: str,
+  partition_idx: int,
+  bundle: Dict[str, torch.Tensor]
+):
+  r""" Save the small tensors of all graph types in a partition into a single
+  file, which avoids opening a file for each node and edge type when saving
+  and loading heterogeneous partitions.
+  """
+  subdir = os.path.join(output_dir, f'part{partition_idx}')
+  ensure_dir(subdir)
+  torch.save(bundle, os.path.join(subdir, 'data.pt'))
+
+
+def _feature_key(
+  group: str,
+  graph_type: Optional[Union[NodeType, EdgeType]] = None
+) -> str:
+  if graph_type is None:
+    return group
+  return f'{group}/{as_str(graph_type)}'
+
+
+def _bundle_prefix(
+  group: str,
+  graph_type: Optional[Union[NodeType, EdgeType]] = None
+) -> str:
+  return f'{_feature_key(group, graph_type)}/'
+
+
+def _record_empty_feature(
+  empty_feats: Dict[str, Dict],
+  partition_idx: int,
+  feature_partition: FeaturePartitionData,
+  group: str = 'node_feat',
+  graph_type: Optional[Union[NodeType, EdgeType]] = None
+) -> bool:
+  r""" Record a feature partition into ``empty_feats`` if it contains neither
+  features nor cached features, with the dtype and row shape of the features
+  to restore it when loading.
+
+  Returns:
+    bool: Whether the feature partition is empty.
+  """
+  cache_ids = feature_partition.cache_ids
+  if (feature_partition.feats.size(0) > 0 or
+      (cache_ids is not None and cache_ids.numel() > 0)):
+    return False
+  record = empty_feats.setdefault(_feature_key(group, graph_type), {
+    'dtype': str(feature_partition.feats.dtype).split('.')[-1],
+    'shape': list(feature_partition.feats.shape[1:]),
+    'parts': []
+  })
+  record['parts'].append(partition_idx)
+  return True
+
+
+def _empty_feature_partition(
+  meta: Dict,
+  partition_idx: int,
+  device: torch.device,
+  group: str = 'node_feat',
+  graph_type: Optional[Union[NodeType, EdgeType]] = None
+) -> Optional[FeaturePartitionData]:
+  r""" Restore an empty feature partition recorded in the meta info, returns
+  ``None`` if it is not recorded.
+  """
+  record = meta.get('empty_feats', {}).get(_feature_key(group, graph_type))
+  if record is None or partition_idx not in record['parts']:
+    return None
+  return FeaturePartitionData(
+    feats=torch.empty((0, *record['shape']),
+                      dtype=getattr(torch, record['dtype']), device=device),
+    ids=torch.empty((0, ), dtype=torch.int64, device=device),
+    cache_feats=None, cache_ids=None
+  )
+
+
+class RangePartitionBook(object):
+  r""" A partition book where each partition owns a contiguous range of ids,
+  which only stores the range bounds instead of the partition index of each
+  id. It can be indexed by ids as a dense partition book tensor.
+
+  Args:
+    bounds (torch.Tensor): The exclusive end ids of the ranges owned by all
+      partitions in ascending order, the first range starts from 0.
+    dtype (torch.dtype): The data type of returned partition indices.
+      (default: ``torch.int64``)
+  """
+  def __init__(self, bounds: torch.Tensor, dtype: torch.dtype = torch.int64):
+    self.bounds = bounds.to(torch.int64)
+    self.dtype = dtype
+
+  def __getitem__(self, ids: torch.Tensor) -> torch.Tensor:
+    ids = ids.to(self.bounds.device)
+    return torch.searchsorted(self.bounds, ids, right=True).to(self.dtype)
+
+  def __len__(self):
+    return self.numel()
+
+  def numel(self) -> int:
+    return int(self.bounds[-1].item()) if self.bounds.numel() > 0 else 0
+
+  @property
+  def device(self) -> torch.device:
+    return self.bounds.device
+
+  def to(self, device: torch.device) -> 'RangePartitionBook':
+    return RangePartitionBook(self.bounds.to(device), self.dtype)
+
+  def share_memory_(self) -> 'RangePartitionBook':
+    self.bounds.share_memory_()
+    return self
+
+
+def partition_book_dtype(num_parts: int) -> torch.dtype:
+  r""" Get the smallest integer dtype to store partition indices of the
+  specified number of partitions.
+  """
+  if num_parts <= 256:
+    return torch.uint8
+  if num_parts <= 32768:
+    return torch.int16
+  return torch.int32
 
 
 class PartitionerBase(ABC):
@@ -132,6 +321,7 @@ class PartitionerBase(ABC):
     edge_feat_dtype: torch.dtype = torch.float32,
     edge_assign_strategy: str = 'by_src',
     chunk_size: int = 10000,
+    with_gpu: bool = False,
   ):
     self.output_dir = output_dir
     ensure_dir(self.output_dir)
@@ -151,18 +341,26 @@ class PartitionerBase(ABC):
       self.data_cls = 'hetero'
       self.node_types = list(self.num_nodes.keys())
       self.edge_types = list(self.edge_index.keys())
-      self.num_edges = {}
-      for etype, index in self.edge_index.items():
-        self.num_edges[etype] = len(index[0])
     else:
       self.data_cls = 'homo'
       self.node_types = None
       self.edge_types = None
-      self.num_edges = len(self.edge_index[0])
 
     self.edge_assign_strategy = edge_assign_strategy.lower()
     assert self.edge_assign_strategy in ['by_src', 'by_dst']
     self.chunk_size = chunk_size
+    self.with_gpu = with_gpu and torch.cuda.is_available()
+
+  @property
+  def num_edges(self) -> Union[int, Dict[EdgeType, int]]:
+    r""" Number of edges, or a dict of edge numbers of all edge types for
+    heterogeneous graphs, which is computed when accessed.
+    """
+    if 'hetero' == self.data_cls:
+      return {
+        etype: _num_edges(index) for etype, index in self.edge_index.items()
+      }
+    return _num_edges(self.edge_index)
 
   def get_edge_index(self, etype: Optional[EdgeType] = None):
     if 'hetero' == self.data_cls:
@@ -233,61 +431,182 @@ class PartitionerBase(ABC):
       List[GraphPartitionData]: A list of graph data for each partition.
       PartitionBook: The partition book of graph edges.
     """
-    edge_index = self.get_edge_index(etype)
-    rows, cols = edge_index[0], edge_index[1]
-    edge_num = len(rows)
-    eids = torch.arange(edge_num, dtype=torch.int64)
-
     if 'hetero' == self.data_cls:
       assert etype is not None
-      assert isinstance(node_pb, dict)
-      src_ntype, _, dst_ntype = etype
+      return self._partition_hetero_graph(node_pb, [etype])[etype]
 
+    edge_index = self.get_edge_index()
+    if 'by_src' == self.edge_assign_strategy:
+      partition_book = node_pb[edge_index[0]]
+    else:
+      partition_book = node_pb[edge_index[1]]
+    graph_lists, edge_pbs = self._group_edges([edge_index], [partition_book])
+    return graph_lists[0], edge_pbs[0]
+
+  def _partition_hetero_graph(
+    self,
+    node_pb: Dict[NodeType, PartitionBook],
+    etypes: List[EdgeType]
+  ) -> Dict[EdgeType, Tuple[List[GraphPartitionData], PartitionBook]]:
+    r""" Partition graph topology of multiple edge types in one pass.
+
+    Returns:
+      Dict[EdgeType, Tuple[List[GraphPartitionData], PartitionBook]]: The
+        partitioned graph data and the edge partition book of each edge type.
+    """
+    assert isinstance(node_pb, dict)
+    edge_index_list, partition_book_list = [], []
+    for etype in etypes:
+      edge_index = self.get_edge_index(etype)
+      src_ntype, _, dst_ntype = etype
       if 'by_src' == self.edge_assign_strategy:
-        target_node_pb = node_pb[src_ntype]
-        target_indices = rows
+        partition_book = node_pb[src_ntype][edge_index[0]]
       else:
-        target_node_pb = node_pb[dst_ntype]
-        target_indices = cols
-    else:
-      target_node_pb = node_pb
-      target_indices = rows if 'by_src' == self.edge_assign_strategy else cols
-
-    chunk_num = (edge_num + self.chunk_size - 1) // self.chunk_size
-    chunk_start_pos = 0
-    res = [[] for _ in range(self.num_parts)]
-    for _ in range(chunk_num):
-      chunk_end_pos = min(edge_num, chunk_start_pos + self.chunk_size)
-      current_chunk_size = chunk_end_pos - chunk_start_pos
-      chunk_idx = torch.arange(current_chunk_size, dtype=torch.long)
-      chunk_rows = rows[chunk_start_pos:chunk_end_pos]
-      chunk_cols = cols[chunk_start_pos:chunk_end_pos]
-      chunk_eids = eids[chunk_start_pos:chunk_end_pos]
-
-      chunk_target_indices = target_indices[chunk_start_pos:chunk_end_pos]
-      chunk_partition_idx = target_node_pb[chunk_target_indices]
-      for pidx in range(self.num_parts):
-        mask = (chunk_partition_idx == pidx)
-        idx = torch.masked_select(chunk_idx, mask)
-        res[pidx].append(GraphPartitionData(
-          edge_index=(chunk_rows[idx], chunk_cols[idx]),
-          eids=chunk_eids[idx]
-        ))
-      chunk_start_pos += current_chunk_size
+        partition_book = node_pb[dst_ntype][edge_index[1]]
+      edge_index_list.append(edge_index)
+      partition_book_list.append(partition_book)
+    graph_lists, edge_pbs = self._group_edges(edge_index_list,
+                                              partition_book_list)
+    return {
+      etype: (graph_list, edge_pb)
+      for etype, graph_list, edge_pb in zip(etypes, graph_lists, edge_pbs)
+    }
+
+  def _group_edges(
+    self,
+    edge_index_list: List[TensorDataType],
+    partition_book_list: List[PartitionBook]
+  ) -> Tuple[List[List[GraphPartitionData]], List[PartitionBook]]:
+    r""" Group the edges of one or more edge types by their partitions.
+
+    Edges of all types are grouped by (partition, edge type) with a single
+    stable sort, which keeps the original edge order of each type in each
+    partition. Rows, cols and eids are gathered into one pre-allocated buffer
+    and the results of each partition and type are views of it. If the edges
+    are already grouped, the sort and gathers are skipped, and each partition
+    owns a contiguous range of edge ids, whose partition book is stored as a
+    ``RangePartitionBook``.
 
-    partition_book = torch.zeros(edge_num, dtype=torch.long)
-    partition_results = []
+    Returns:
+      List[List[GraphPartitionData]]: The graph data of each partition for
+        each input edge type.
+      List[PartitionBook]: The edge partition book of each input edge type.
+    """
+    num_types = len(edge_index_list)
+    num_edges = [_num_edges(edge_index) for edge_index in edge_index_list]
+    if num_types == 1:
+      rows, cols = edge_index_list[0][0], edge_index_list[0][1]
+      keys = partition_book_list[0]
+    else:
+      rows = torch.cat([edge_index[0] for edge_index in edge_index_list])
+      cols = torch.cat([edge_index[1] for edge_index in edge_index_list])
+      type_ids = torch.repeat_interleave(
+        torch.arange(num_types, dtype=torch.int64),
+        torch.tensor(num_edges, dtype=torch.int64)
+      )
+      keys = torch.cat(partition_book_list).to(torch.int64) * num_types + type_ids
+    # offsets of each type in the concatenated edges, the eid of an edge is
+    # its index minus the offset of its type.
+    type_offsets = [0] + torch.cumsum(
+      torch.tensor(num_edges, dtype=torch.int64), 0).tolist()
+
+    counts = torch.bincount(keys, minlength=self.num_parts * num_types)
+    bounds = [0] + torch.cumsum(counts, 0).tolist()
+    grouped = keys.numel() < 2 or bool(torch.all(keys[:-1] <= keys[1:]))
+    if grouped:
+      # Edges are already grouped, e.g. edges sorted by their target nodes
+      # with a range partitioned node partition book, the results of each
+      # partition and type are slices of the input without sorting and
+      # gathering.
+      p_rows, p_cols = rows, cols
+      type_counts = counts.view(self.num_parts, num_types)
+      edge_pbs = [
+        RangePartitionBook(torch.cumsum(type_counts[:, tidx], 0),
+                           dtype=partition_book_list[tidx].dtype)
+        for tidx in range(num_types)
+      ]
+    else:
+      # The sorted order is written into the eids row of the buffer directly,
+      # and turned into eids after gathering rows and cols.
+      buffer = torch.empty((3, sum(num_edges)), dtype=torch.int64)
+      torch.sort(keys, stable=True, out=(torch.empty_like(keys), buffer[2]))
+      torch.index_select(rows, 0, buffer[2], out=buffer[0])
+      torch.index_select(cols, 0, buffer[2], out=buffer[1])
+      p_rows, p_cols, p_eids = buffer[0], buffer[1], buffer[2]
+      edge_pbs = partition_book_list
+
+    results = [[] for _ in range(num_types)]
     for pidx in range(self.num_parts):
-      p_rows = torch.cat([r.edge_index[0] for r in res[pidx]])
-      p_cols = torch.cat([r.edge_index[1] for r in res[pidx]])
-      p_eids = torch.cat([r.eids for r in res[pidx]])
-      partition_book[p_eids] = pidx
-      partition_results.append(GraphPartitionData(
-        edge_index=(p_rows, p_cols),
-        eids=p_eids
-      ))
+      for tidx in range(num_types):
+        key = pidx * num_types + tidx
+        start, end = bounds[key], bounds[key + 1]
+        offset = type_offsets[tidx]
+        if grouped:
+          seg_eids = torch.arange(start - offset, end - offset,
+                                  dtype=torch.int64)
+        else:
+          seg_eids = p_eids[start:end]
+          if offset > 0:
+            seg_eids.sub_(offset)
+        results[tidx].append(GraphPartitionData(
+          edge_index=(p_rows[start:end], p_cols[start:end]),
+          eids=seg_eids
+        ))
+    return results, edge_pbs
 
-    return partition_results, partition_book
+  def _edge_type_groups(self) -> List[List[EdgeType]]:
+    r""" Group consecutive edge types to be partitioned in one pass, the total
+    number of edges in a group does not exceed the one of the largest edge
+    type, so that small edge types are fused while the memory of a pass stays
+    bounded by the largest edge type.
+    """
+    num_edges_dict = self.num_edges
+    max_num_edges = max(num_edges_dict.values())
+    groups, group_num_edges = [], 0
+    for etype in self.edge_types:
+      num_edges = num_edges_dict[etype]
+      if len(groups) == 0 or group_num_edges + num_edges > max_num_edges:
+        groups.append([])
+        group_num_edges = 0
+      groups[-1].append(etype)
+      group_num_edges += num_edges
+    return groups
+
+  def _feature_gather(self, feat: torch.Tensor):
+    r""" Get the function to gather rows of a feature tensor by ids.
+
+    If ``with_gpu`` is set, the feature tensor in CPU memory is accessed by
+    the current GPU with zero-copy through a ``UnifiedTensor``, rows are
+    gathered by GPU and copied back to CPU memory. Feature tensors in
+    read-only memory (e.g. read-only memory-mapped files) cannot be registered
+    for zero-copy access, and are gathered by CPU instead.
+
+    Ids of a contiguous ascending range are gathered as a view of the feature
+    tensor without copying if ``view`` is set to ``True`` when gathering, which
+    should only be used for results saved as raw tensors, since ``torch.save``
+    writes the whole storage of a view.
+    """
+    cpu_feat = feat.contiguous() if self.with_gpu else None
+    if cpu_feat is not None and _is_writable_memory(cpu_feat):
+      from ..data import UnifiedTensor
+      unified_feat = UnifiedTensor(torch.cuda.current_device(), feat.dtype)
+      # The registered tensor is kept by the `UnifiedTensor` as its cpu part,
+      # which must outlive the gathers.
+      unified_feat.cpu_part = cpu_feat
+      unified_feat.append_cpu_tensor(cpu_feat)
+      index_gather = lambda ids: unified_feat[ids].cpu()
+    else:
+      index_gather = lambda ids: torch.index_select(feat, 0, ids)
+
+    def gather(ids: torch.Tensor, view: bool = False) -> torch.Tensor:
+      num = ids.numel()
+      if view and num > 0:
+        start, end = int(ids[0]), int(ids[-1]) + 1
+        if end - start == num and (
+            num == 1 or bool(torch.all(ids[1:] - ids[:-1] == 1))):
+          return feat[start:end]
+      return index_gather(ids)
+    return gather
 
   def _partition_node_feat(
     self,
@@ -301,14 +620,15 @@ class PartitionerBase(ABC):
     if node_feat is None:
       return [None for _ in range(self.num_parts)]
     cache_node_ids_list = self._cache_node(ntype)
+    gather = self._feature_gather(node_feat)
     res = []
     for pidx in range(self.num_parts):
       n_ids = node_ids_list[pidx]
       cache_n_ids = cache_node_ids_list[pidx]
       p_node_feat = FeaturePartitionData(
-        feats=node_feat[n_ids],
+        feats=gather(n_ids, view=is_raw_dtype(node_feat.dtype)),
         ids=n_ids,
-        cache_feats=(node_feat[cache_n_ids] if cache_n_ids is not None else None),
+        cache_feats=(gather(cache_n_ids) if cache_n_ids is not None else None),
         cache_ids=cache_n_ids
       )
       res.append(p_node_feat)
@@ -324,11 +644,12 @@ class PartitionerBase(ABC):
     edge_feat = self.get_edge_feat(etype)
     if edge_feat is None:
       return [None for _ in range(self.num_parts)]
+    gather = self._feature_gather(edge_feat)
     res = []
     for pidx in range(self.num_parts):
       eids = graph_list[pidx].eids
       p_edge_feat = FeaturePartitionData(
-        feats=edge_feat[eids], ids=eids,
+        feats=gather(eids, view=is_raw_dtype(edge_feat.dtype)), ids=eids,
         cache_feats=None, cache_ids=None
       )
       res.append(p_edge_feat)
@@ -343,23 +664,17 @@ class PartitionerBase(ABC):
 
       root_dir/
       |-- META
-      |-- node_pb.pt
-      |-- edge_pb.pt
+      |-- node_pb.npy
+      |-- edge_pb.npy (or edge_pb.bounds.npy)
       |-- part0/
+          |-- data.pt (feature ids and cached ids of node_feat and edge_feat)
           |-- graph/
-              |-- rows.pt
-              |-- cols.pt
-              |-- eids.pt
+              |-- data.npy (rows, cols, eids)
           |-- node_feat/
-              |-- feats.pt
-              |-- ids.pt
-              |-- cache_feats.pt (optional)
-              |-- cache_ids.pt (optional)
+              |-- feats.npy
+              |-- cache_feats.npy (if cached)
           |-- edge_feat/
-              |-- feats.pt
-              |-- ids.pt
-              |-- cache_feats.pt (optional)
-              |-- cache_ids.pt (optional)
+              |-- feats.npy
       |-- part1/
           |-- graph/
               ...
@@ -373,33 +688,27 @@ class PartitionerBase(ABC):
       root_dir/
       |-- META
       |-- node_pb/
-          |-- ntype1.pt
-          |-- ntype2.pt
+          |-- ntype1.npy
+          |-- ntype2.npy
       |-- edge_pb/
-          |-- etype1.pt
-          |-- etype2.pt
+          |-- etype1.npy (or etype1.bounds.npy)
+          |-- etype2.npy
       |-- part0/
+          |-- data.pt (feature ids and cached ids of all node and edge types)
           |-- graph/
               |-- etype1/
-                  |-- rows.pt
-                  |-- cols.pt
-                  |-- eids.pt
+                  |-- data.npy (rows, cols, eids)
               |-- etype2/
                   ...
           |-- node_feat/
               |-- ntype1/
-                  |-- feats.pt
-                  |-- ids.pt
-                  |-- cache_feats.pt (optional)
-                  |-- cache_ids.pt (optional)
+                  |-- feats.npy
+                  |-- cache_feats.npy (if cached)
               |-- ntype2/
                   ...
           |-- edge_feat/
               |-- etype1/
-                  |-- feats.pt
-                  |-- ids.pt
-                  |-- cache_feats.pt (optional)
-                  |-- cache_ids.pt (optional)
+                  |-- feats.npy
               |-- etype2/
                   ...
       |-- part1/
@@ -410,91 +719,264 @@ class PartitionerBase(ABC):
           |-- edge_feat/
               ...
 
+    Feature tensors of dtypes not supported by numpy are saved as ``.pt``
+    files instead of ``.npy`` files. Edge feature ids are not saved, as they are the
+    same as the eids of the graph partition. Feature partitions without any
+    features are not saved but recorded in META.
     """
-    if 'hetero' == self.data_cls:
-      node_pb_dict = {}
-      for ntype in self.node_types:
-        node_ids_list, node_pb = self._partition_node(ntype)
-        node_feat_list = self._partition_node_feat(node_ids_list, ntype)
+    # Node partition books are stored with the smallest integer dtype, edge
+    # partition books are gathered from them and thus have the same dtype.
+    pb_dtype = partition_book_dtype(self.num_parts)
+    # Partitioned results are saved by a thread pool, the results of a node or
+    # edge type are written while the next type is being partitioned.
+    max_workers = min(self.num_parts, os.cpu_count() or 1)
+    # Small tensors of all types in a partition are gathered and saved into a
+    # single file at the end.
+    bundles = [{} for _ in range(self.num_parts)]
+    # Empty feature partitions are not saved but recorded in the meta info.
+    empty_feats = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+      pending = []
+      if 'hetero' == self.data_cls:
+        node_pb_dict = {}
+        for ntype in self.node_types:
+          node_ids_list, node_pb = self._partition_node(ntype)
+          node_pb = node_pb.to(pb_dtype)
+          node_feat_list = self._partition_node_feat(node_ids_list, ntype)
+          futures = [pool.submit(save_node_pb, self.output_dir, node_pb, ntype)]
+          for pidx in range(self.num_parts):
+            if node_feat_list[pidx] is None or _record_empty_feature(
+                empty_feats, pidx, node_feat_list[pidx], 'node_feat', ntype):
+              continue
+            futures.append(pool.submit(
+              save_feature_partition, self.output_dir, pidx,
+              node_feat_list[pidx], group='node_feat', graph_type=ntype,
+              bundle=bundles[pidx]
+            ))
+          node_pb_dict[ntype] = node_pb
+          _wait_futures(pending)
+          pending = futures
+
+        for etypes in self._edge_type_groups():
+          graph_results = self._partition_hetero_graph(node_pb_dict, etypes)
+          futures = []
+          for etype in etypes:
+            graph_list, edge_pb = graph_results[etype]
+            edge_feat_list = self._partition_edge_feat(graph_list, etype)
+            futures.append(
+              pool.submit(save_edge_pb, self.output_dir, edge_pb, etype))
+            for pidx in range(self.num_parts):
+              futures.append(pool.submit(
+                save_graph_partition, self.output_dir, pidx, graph_list[pidx],
+                etype
+              ))
+              if edge_feat_list[pidx] is None or _record_empty_feature(
+                  empty_feats, pidx, edge_feat_list[pidx], 'edge_feat', etype):
+                continue
+              # edge feature ids are the same as graph eids.
+              futures.append(pool.submit(
+                save_feature_partition, self.output_dir, pidx,
+                edge_feat_list[pidx]._replace(ids=None),
+                group='edge_feat', graph_type=etype, bundle=bundles[pidx]
+              ))
+          _wait_futures(pending)
+          pending = futures
+
+      else:
+        node_ids_list, node_pb = self._partition_node()
+        node_pb = node_pb.to(pb_dtype)
+        node_feat_list = self._partition_node_feat(node_ids_list)
+        futures = [pool.submit(save_node_pb, self.output_dir, node_pb)]
         for pidx in range(self.num_parts):
-          if node_feat_list[pidx] is not None:
-            save_feature_partition(self.output_dir, pidx, node_feat_list[pidx],
-                                    group='node_feat', graph_type=ntype)
-        save_node_pb(self.output_dir, node_pb, ntype)
-        node_pb_dict[ntype] = node_pb
-
-      for etype in self.edge_types:
-        graph_list, edge_pb = self._partition_graph(node_pb_dict, etype)
-        edge_feat_list = self._partition_edge_feat(graph_list, etype)
+          if node_feat_list[pidx] is None or _record_empty_feature(
+              empty_feats, pidx, node_feat_list[pidx], 'node_feat'):
+            continue
+          futures.append(pool.submit(
+            save_feature_partition, self.output_dir, pidx,
+            node_feat_list[pidx], group='node_feat', bundle=bundles[pidx]
+          ))
+        pending = futures
+
+        graph_list, edge_pb = self._partition_graph(node_pb)
+        edge_feat_list = self._partition_edge_feat(graph_list)
+        futures = [pool.submit(save_edge_pb, self.output_dir, edge_pb)]
         for pidx in range(self.num_parts):
-          save_graph_partition(self.output_dir, pidx, graph_list[pidx], etype)
-          if edge_feat_list[pidx] is not None:
-            save_feature_partition(self.output_dir, pidx, edge_feat_list[pidx],
-                                    group='edge_feat', graph_type=etype)
-        save_edge_pb(self.output_dir, edge_pb, etype)
-
-    else:
-      node_ids_list, node_pb = self._partition_node()
-      node_feat_list = self._partition_node_feat(node_ids_list)
-      for pidx in range(self.num_parts):
-        if node_feat_list[pidx] is not None:
-          save_feature_partition(self.output_dir, pidx, node_feat_list[pidx],
-                                  group='node_feat')
-      save_node_pb(self.output_dir, node_pb)
-
-      graph_list, edge_pb = self._partition_graph(node_pb)
-      edge_feat_list = self._partition_edge_feat(graph_list)
-      for pidx in range(self.num_parts):
-        save_graph_partition(self.output_dir, pidx, graph_list[pidx])
-        if edge_feat_list[pidx] is not None:
-          save_feature_partition(self.output_dir, pidx, edge_feat_list[pidx],
-                                  group='edge_feat')
-      save_edge_pb(self.output_dir, edge_pb)
+          futures.append(pool.submit(
+            save_graph_partition, self.output_dir, pidx, graph_list[pidx]
+          ))
+          if edge_feat_list[pidx] is None or _record_empty_feature(
+              empty_feats, pidx, edge_feat_list[pidx], 'edge_feat'):
+            continue
+          # edge feature ids are the same as graph eids.
+          futures.append(pool.submit(
+            save_feature_partition, self.output_dir, pidx,
+            edge_feat_list[pidx]._replace(ids=None),
+            group='edge_feat', bundle=bundles[pidx]
+          ))
+        _wait_futures(pending)
+        pending = futures
+
+      _wait_futures(pending)
+      _wait_futures([
+        pool.submit(save_partition_bundle, self.output_dir, pidx, bundle)
+        for pidx, bundle in enumerate(bundles)
+      ])
 
     # save meta.
     save_meta(self.output_dir, self.num_parts, self.data_cls,
-              self.node_types, self.edge_types)
+              self.node_types, self.edge_types, empty_feats)
+
+
+def _num_edges(edge_index: TensorDataType) -> int:
+  r""" Get the number of edges of an edge index, which is either a tensor of
+  shape [2, num_edges] or a pair of rows and cols.
+  """
+  if isinstance(edge_index, torch.Tensor):
+    return edge_index.size(1)
+  return edge_index[0].size(0)
+
+
+def _is_writable_memory(tensor: torch.Tensor) -> bool:
+  r""" Check whether the memory of a cpu tensor is writable by the memory
+  mappings of the current process, which is required to register the memory
+  for CUDA zero-copy access.
+  """
+  start = tensor.data_ptr()
+  end = start + tensor.numel() * tensor.element_size()
+  try:
+    with open('/proc/self/maps', 'r') as maps:
+      for line in maps:
+        addr_range, perms = line.split()[:2]
+        lo, hi = (int(addr, 16) for addr in addr_range.split('-'))
+        if lo < end and hi > start and 'w' not in perms:
+          return False
+  except OSError:
+    pass
+  return True
+
+
+def _wait_futures(futures: List[Future]):
+  r""" Wait for all futures to finish and re-raise their exceptions.
+  """
+  for future in futures:
+    future.result()
+
+
+def _load_torch_saved(path: str, device: torch.device, mmap: bool = False):
+  r""" Load tensors saved by ``torch.save``. If ``mmap`` is set, they are
+  copied from the memory-mapped file into shared memory, as storages mapped
+  by ``torch.load`` are reported as shared and cannot be moved into shared
+  memory when the loaded partition is shared with other processes.
+  """
+  data = load_tensor(path, map_location=device, mmap=mmap)
+  if mmap:
+    data = copy_to_shared_memory(data)
+  return data
+
+
+def _load_partition_data(
+  data_dir: str,
+  keys: List[str],
+  device: torch.device,
+  mmap: bool = False
+) -> Dict[str, torch.Tensor]:
+  r""" Load the tensors of a graph or feature partition saved in one file,
+  partitions of earlier versions with one file per tensor are also supported.
+  """
+  data_path = os.path.join(data_dir, 'data.pt')
+  if os.path.exists(data_path):
+    return _load_torch_saved(data_path, device, mmap)
+  data = {}
+  for key in keys:
+    path = os.path.join(data_dir, f'{key}.pt')
+    if os.path.exists(path):
+      data[key] = _load_torch_saved(path, device, mmap)
+  return data
+
+
+def _load_partition_book(
+  path_prefix: str,
+  device: torch.device,
+  mmap: bool = False
+) -> PartitionBook:
+  r""" Load a partition book saved with the specified path prefix, partition
+  books of earlier versions saved by ``torch.save`` are also supported.
+  """
+  if os.path.exists(f'{path_prefix}.npy'):
+    return load_tensor_raw(f'{path_prefix}.npy', map_location=device, mmap=mmap)
+  if os.path.exists(f'{path_prefix}.bounds.npy'):
+    bounds = load_tensor_raw(f'{path_prefix}.bounds.npy', map_location=device)
+    return RangePartitionBook(bounds, partition_book_dtype(bounds.numel()))
+  return _load_torch_saved(f'{path_prefix}.pt', device, mmap)
 
 
 def _load_graph_partition_data(
   graph_data_dir: str,
-  device: torch.device
+  device: torch.device,
+  mmap: bool = False
 ) -> GraphPartitionData:
   r""" Load a graph partition data from the specified directory.
   """
   if not os.path.exists(graph_data_dir):
     return None
-  rows = torch.load(os.path.join(graph_data_dir, 'rows.pt'),
-                    map_location=device)
-  cols = torch.load(os.path.join(graph_data_dir, 'cols.pt'),
-                    map_location=device)
-  eids = torch.load(os.path.join(graph_data_dir, 'eids.pt'),
-                    map_location=device)
-  pdata = GraphPartitionData(edge_index=(rows, cols), eids=eids)
+  raw_path = os.path.join(graph_data_dir, 'data.npy')
+  if os.path.exists(raw_path):
+    data = load_tensor_raw(raw_path, map_location=device, mmap=mmap)
+    return GraphPartitionData(edge_index=(data[0], data[1]), eids=data[2])
+  data = _load_partition_data(graph_data_dir, ['rows', 'cols', 'eids'],
+                              device, mmap)
+  pdata = GraphPartitionData(edge_index=(data['rows'], data['cols']),
+                             eids=data['eids'])
   return pdata
 
 
 def _load_feature_partition_data(
   feature_data_dir: str,
-  device: torch.device
+  device: torch.device,
+  mmap: bool = False,
+  bundle: Optional[Dict[str, torch.Tensor]] = None,
+  bundle_prefix: str = '',
+  eids: Optional[torch.Tensor] = None
 ) -> FeaturePartitionData:
-  r""" Load a feature partition data from the specified directory.
+  r""" Load a feature partition data from the specified directory, tensors
+  saved into the partition bundle are looked up with ``bundle_prefix``. If the
+  feature ids are not saved, ``eids`` of the graph partition are used.
   """
   if not os.path.exists(feature_data_dir):
     return None
-  feats = torch.load(os.path.join(feature_data_dir, 'feats.pt'),
-                     map_location=device)
-  ids = torch.load(os.path.join(feature_data_dir, 'ids.pt'),
-                   map_location=device)
-  cache_feats_path = os.path.join(feature_data_dir, 'cache_feats.pt')
-  cache_ids_path = os.path.join(feature_data_dir, 'cache_ids.pt')
-  cache_feats = None
-  cache_ids = None
-  if os.path.exists(cache_feats_path) and os.path.exists(cache_ids_path):
-    cache_feats = torch.load(cache_feats_path, map_location=device)
-    cache_ids = torch.load(cache_ids_path, map_location=device)
+  if bundle is not None:
+    data = {
+      key: bundle[bundle_prefix + key]
+      for key in ['ids', 'cache_ids']
+      if bundle_prefix + key in bundle
+    }
+    cache_feats_path = os.path.join(feature_data_dir, 'cache_feats')
+    if os.path.exists(f'{cache_feats_path}.npy'):
+      data['cache_feats'] = load_tensor_raw(
+        f'{cache_feats_path}.npy', map_location=device, mmap=mmap)
+    elif os.path.exists(f'{cache_feats_path}.pt'):
+      data['cache_feats'] = _load_torch_saved(
+        f'{cache_feats_path}.pt', device, mmap)
+    feats_path = os.path.join(feature_data_dir, 'feats.pt')
+    if os.path.exists(feats_path):
+      data['feats'] = _load_torch_saved(feats_path, device, mmap)
+  else:
+    data = _load_partition_data(
+      feature_data_dir, ['feats', 'ids', 'cache_feats', 'cache_ids'],
+      device, mmap
+    )
+  raw_feats_path = os.path.join(feature_data_dir, 'feats.npy')
+  if os.path.exists(raw_feats_path):
+    data['feats'] = load_tensor_raw(raw_feats_path, map_location=device,
+                                    mmap=mmap)
+  if 'ids' not in data:
+    data['ids'] = eids
+  cache_feats, cache_ids = data.get('cache_feats'), data.get('cache_ids')
+  if cache_feats is None or cache_ids is None:
+    cache_feats, cache_ids = None, None
   pdata = FeaturePartitionData(
-    feats=feats, ids=ids, cache_feats=cache_feats, cache_ids=cache_ids
+    feats=data['feats'], ids=data['ids'],
+    cache_feats=cache_feats, cache_ids=cache_ids
   )
   return pdata
 
@@ -502,7 +984,8 @@ def _load_feature_partition_data(
 def load_partition(
   root_dir: str,
   partition_idx: int,
-  device: torch.device = torch.device('cpu')
+  device: torch.device = torch.device('cpu'),
+  mmap: bool = False
 ) -> Union[Tuple[int, int,
                  GraphPartitionData,
                  Optional[FeaturePartitionData],
@@ -521,6 +1004,11 @@ def load_partition(
     root_dir (str): The root directory for saved files.
     partition_idx (int): The partition idx to load.
     device (torch.device): The device where loaded graph partition data locates.
+    mmap (bool): Set to ``True`` to memory-map the saved raw tensors instead
+      of reading them into memory, only the accessed pages will be loaded from
+      disk. Tensors saved by ``torch.save`` are read from the memory-mapped
+      files (PyTorch >= 2.1) into shared memory, so that the loaded partition
+      can be shared with other processes. (default: ``False``)
 
   Returns:
     int: Number of all partitions.
@@ -533,8 +1021,7 @@ def load_partition(
     PartitionBook/HeteroNodePartitionDict: node partition book.
     PartitionBook/HeteroEdgePartitionDict: edge partition book.
   """
-  with open(os.path.join(root_dir, 'META'), 'rb') as infile:
-    meta = pickle.load(infile)
+  meta = load_meta(root_dir)
   num_partitions = meta['num_parts']
   assert partition_idx >= 0
   assert partition_idx < num_partitions
@@ -544,17 +1031,30 @@ def load_partition(
   graph_dir = os.path.join(partition_dir, 'graph')
   node_feat_dir = os.path.join(partition_dir, 'node_feat')
   edge_feat_dir = os.path.join(partition_dir, 'edge_feat')
+  bundle_path = os.path.join(partition_dir, 'data.pt')
+  bundle = None
+  if os.path.exists(bundle_path):
+    bundle = _load_torch_saved(bundle_path, device, mmap)
 
   # homogenous
 
   if meta['data_cls'] == 'homo':
-    graph = _load_graph_partition_data(graph_dir, device)
-    node_feat = _load_feature_partition_data(node_feat_dir, device)
-    edge_feat = _load_feature_partition_data(edge_feat_dir, device)
-    node_pb = torch.load(os.path.join(root_dir, 'node_pb.pt'),
-                         map_location=device)
-    edge_pb = torch.load(os.path.join(root_dir, 'edge_pb.pt'),
-                         map_location=device)
+    graph = _load_graph_partition_data(graph_dir, device, mmap)
+    node_feat = _empty_feature_partition(
+      meta, partition_idx, device, 'node_feat')
+    if node_feat is None:
+      node_feat = _load_feature_partition_data(
+        node_feat_dir, device, mmap, bundle, _bundle_prefix('node_feat'))
+    edge_feat = _empty_feature_partition(
+      meta, partition_idx, device, 'edge_feat')
+    if edge_feat is None:
+      edge_feat = _load_feature_partition_data(
+        edge_feat_dir, device, mmap, bundle, _bundle_prefix('edge_feat'),
+        graph.eids)
+    node_pb = _load_partition_book(os.path.join(root_dir, 'node_pb'),
+                                   device, mmap)
+    edge_pb = _load_partition_book(os.path.join(root_dir, 'edge_pb'),
+                                   device, mmap)
     return (
       num_partitions, partition_idx,
       graph, node_feat, edge_feat, node_pb, edge_pb
@@ -565,12 +1065,16 @@ def load_partition(
   graph_dict = {}
   for etype in meta['edge_types']:
     graph_dict[etype] = _load_graph_partition_data(
-      os.path.join(graph_dir, as_str(etype)), device)
+      os.path.join(graph_dir, as_str(etype)), device, mmap)
 
   node_feat_dict = {}
   for ntype in meta['node_types']:
-    node_feat = _load_feature_partition_data(
-      os.path.join(node_feat_dir, as_str(ntype)), device)
+    node_feat = _empty_feature_partition(
+      meta, partition_idx, device, 'node_feat', ntype)
+    if node_feat is None:
+      node_feat = _load_feature_partition_data(
+        os.path.join(node_feat_dir, as_str(ntype)), device, mmap,
+        bundle, _bundle_prefix('node_feat', ntype))
     if node_feat is not None:
       node_feat_dict[ntype] = node_feat
   if len(node_feat_dict) == 0:
@@ -578,8 +1082,12 @@ def load_partition(
 
   edge_feat_dict = {}
   for etype in meta['edge_types']:
-    edge_feat = _load_feature_partition_data(
-      os.path.join(edge_feat_dir, as_str(etype)), device)
+    edge_feat = _empty_feature_partition(
+      meta, partition_idx, device, 'edge_feat', etype)
+    if edge_feat is None:
+      edge_feat = _load_feature_partition_data(
+        os.path.join(edge_feat_dir, as_str(etype)), device, mmap,
+        bundle, _bundle_prefix('edge_feat', etype), graph_dict[etype].eids)
     if edge_feat is not None:
       edge_feat_dict[etype] = edge_feat
   if len(edge_feat_dict) == 0:
@@ -588,14 +1096,14 @@ def load_partition(
   node_pb_dict = {}
   node_pb_dir = os.path.join(root_dir, 'node_pb')
   for ntype in meta['node_types']:
-    node_pb_dict[ntype] = torch.load(
-      os.path.join(node_pb_dir, f'{as_str(ntype)}.pt'), map_location=device)
+    node_pb_dict[ntype] = _load_partition_book(
+      os.path.join(node_pb_dir, as_str(ntype)), device, mmap)
 
   edge_pb_dict = {}
   edge_pb_dir = os.path.join(root_dir, 'edge_pb')
   for etype in meta['edge_types']:
-    edge_pb_dict[etype] = torch.load(
-      os.path.join(edge_pb_dir, f'{as_str(etype)}.pt'), map_location=device)
+    edge_pb_dict[etype] = _load_partition_book(
+      os.path.join(edge_pb_dir, as_str(etype)), device, mmap)
 
   return (
     num_partitions, partition_idx,
@@ -633,13 +1141,17 @@ def cat_feature_cache(
   cache_ratio = cache_ids.size(0) / (cache_ids.size(0) + ids.size(0))
   # cat features
   new_feats = torch.cat([cache_feats, feats])
-  # compute id2idx
-  max_id = max(torch.max(cache_ids).item(), torch.max(ids).item())
+  # compute id2idx with a single sync and a single scatter, the index of a
+  # cached id is smaller than the index of the same id in the original
+  # partition, thus reducing with `amin` makes cached ids take precedence.
+  all_ids = torch.cat([cache_ids, ids]).to(torch.int64)
+  max_id = torch.max(all_ids).item()
   nid2idx = torch.zeros(max_id + 1, dtype=torch.int64, device=device)
-  nid2idx[ids] = (torch.arange(ids.size(0), dtype=torch.int64, device=device) +
-                  cache_ids.size(0))
-  nid2idx[cache_ids] = torch.arange(cache_ids.size(0), dtype=torch.int64,
-                                   device=device)
+  nid2idx.scatter_reduce_(
+    0, all_ids,
+    torch.arange(all_ids.size(0), dtype=torch.int64, device=device),
+    reduce='amin', include_self=False
+  )
   # modify partition book
   new_feat_pb = feat_pb.clone()
   new_feat_pb[cache_ids] = partition_idx
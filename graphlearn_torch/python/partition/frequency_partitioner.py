@@ -44,7 +44,10 @@ class FrequencyPartitioner(PartitionerBase):
       per partition for each node type, should be a dict for hetero data.
     cache_ratio: The proportion to cache node features per partition for each
       node type, should be a dict for hetero data.
-    chunk_size: The chunk size for partitioning.
+    chunk_size: The chunk size for partitioning nodes, graph edges are
+      partitioned in one pass and do not use it.
+    with_gpu: Set to ``True`` to gather partitioned features with the current
+      GPU, which accesses the feature tensors in CPU memory with zero-copy.
 
   Note that if both `cache_memory_budget` and `cache_ratio` are provided,
   the metric that caches the smaller number of features will be used.
@@ -65,10 +68,11 @@ class FrequencyPartitioner(PartitionerBase):
     cache_memory_budget: Union[int, Dict[NodeType, int]] = None,
     cache_ratio: Union[float, Dict[NodeType, float]] = None,
     chunk_size: int = 10000,
+    with_gpu: bool = False,
   ):
     super().__init__(output_dir, num_parts, num_nodes, edge_index, node_feat,
                      node_feat_dtype, edge_feat, edge_feat_dtype,
-                     edge_assign_strategy, chunk_size)
+                     edge_assign_strategy, chunk_size, with_gpu)
 
     self.probs = probs
     if self.node_feat is not None:
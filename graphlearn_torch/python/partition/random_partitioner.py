@@ -40,7 +40,10 @@ class RandomPartitioner(PartitionerBase):
     edge_feat_dtype: The data type of edge features.
     edge_assign_strategy: The assignment strategy when partitioning edges,
       should be 'by_src' or 'by_dst'.
-    chunk_size: The chunk size for partitioning.
+    chunk_size: The chunk size for partitioning, graph edges are partitioned
+      in one pass and do not use it.
+    with_gpu: Set to ``True`` to gather partitioned features with the current
+      GPU, which accesses the feature tensors in CPU memory with zero-copy.
   """
   def __init__(
     self,
@@ -54,10 +57,11 @@ class RandomPartitioner(PartitionerBase):
     edge_feat_dtype: torch.dtype = torch.float32,
     edge_assign_strategy: str = 'by_src',
     chunk_size: int = 10000,
+    with_gpu: bool = False,
   ):
     super().__init__(output_dir, num_parts, num_nodes, edge_index, node_feat,
                      node_feat_dtype, edge_feat, edge_feat_dtype,
-                     edge_assign_strategy, chunk_size)
+                     edge_assign_strategy, chunk_size, with_gpu)
 
   def _partition_node(
     self,
@@ -22,8 +22,7 @@ from .tensor import id2idx
 import torch
 
 def ensure_dir(dir_path: str):
-  if not os.path.exists(dir_path):
-    os.makedirs(dir_path)
+  os.makedirs(dir_path, exist_ok=True)
 
 
 def merge_dict(in_dict: Dict[Any, Any], out_dict: Dict[Any, Any]):
@@ -13,10 +13,20 @@
 # limitations under the License.
 # ==============================================================================
 
+import inspect as _inspect
 from typing import Any, List, Union
 
 import numpy
 import torch
+from numpy.lib import format as _npy_format
+
+
+_torch_load_with_mmap = 'mmap' in _inspect.signature(torch.load).parameters
+
+_raw_dtypes = {
+  torch.bool, torch.uint8, torch.int8, torch.int16, torch.int32, torch.int64,
+  torch.float16, torch.float32, torch.float64
+}
 
 
 def tensor_equal_with_device(lhs: torch.Tensor, rhs: torch.Tensor):
@@ -64,6 +74,76 @@ def convert_to_tensor(data: Any, dtype: torch.dtype = None):
   return data
 
 
+def load_tensor(path: str, map_location: Any = None, mmap: bool = False):
+  r""" Load tensor data saved by ``torch.save``.
+
+  If ``mmap`` is True and the installed PyTorch supports it (>= 2.1), the
+  tensor storages are memory-mapped from the file instead of being read into
+  memory, otherwise it falls back to a regular ``torch.load``.
+  """
+  if mmap and _torch_load_with_mmap:
+    return torch.load(path, map_location=map_location,
+                      mmap=True, weights_only=True)
+  return torch.load(path, map_location=map_location)
+
+
+def is_raw_dtype(dtype: torch.dtype):
+  r""" Check whether tensors of a dtype can be saved by ``save_tensor_raw``.
+  """
+  return dtype in _raw_dtypes
+
+
+def save_tensor_raw(tensor: torch.Tensor, path: str):
+  r""" Save a tensor as a ``.npy`` file, which only contains a small header of
+  dtype and shape followed by the raw tensor bytes, without the zip archive
+  and pickling of ``torch.save``.
+
+  The tensor dtype must be supported by numpy, see ``is_raw_dtype``.
+  """
+  save_stacked_tensors_raw([tensor], path, stack=False)
+
+
+def save_stacked_tensors_raw(
+  tensors: List[torch.Tensor],
+  path: str,
+  stack: bool = True
+):
+  r""" Save tensors of the same dtype and shape as a single ``.npy`` file of
+  ``torch.stack(tensors)``, the tensors are written one by one without being
+  copied into a stacked tensor. If ``stack`` is False, a single tensor is
+  saved as is.
+  """
+  arrays = [t.detach().cpu().contiguous().numpy() for t in tensors]
+  assert all(array.dtype == arrays[0].dtype and
+             array.shape == arrays[0].shape for array in arrays)
+  header = _npy_format.header_data_from_array_1_0(arrays[0])
+  if stack:
+    header['shape'] = (len(arrays), ) + arrays[0].shape
+  # Write with an unbuffered file, so that the tensor bytes are passed to the
+  # kernel directly from the tensor memory rather than through a user-space
+  # buffer.
+  with open(path, 'wb', buffering=0) as f:
+    _npy_format.write_array_header_1_0(f, header)
+    for array in arrays:
+      data = memoryview(array.reshape(-1).view(numpy.uint8))
+      while len(data) > 0:
+        # a single write may be partial for very large buffers.
+        data = data[f.write(data):]
+
+
+def load_tensor_raw(path: str, map_location: Any = None, mmap: bool = False):
+  r""" Load a tensor saved by ``save_tensor_raw``.
+
+  If ``mmap`` is True, the tensor is memory-mapped from the file in
+  copy-on-write mode, only the accessed pages will be read from disk.
+  """
+  array = numpy.load(path, mmap_mode='c' if mmap else None, allow_pickle=False)
+  tensor = torch.from_numpy(array)
+  if map_location is not None:
+    tensor = tensor.to(map_location)
+  return tensor
+
+
 def apply_to_all_tensor(data: Any, tensor_method, *args, **kwargs):
   r""" Apply the specified method to all tensors contained by the
   input data recursively.
@@ -91,6 +171,24 @@ def share_memory(data: Any):
   return apply_to_all_tensor(data, torch.Tensor.share_memory_)
 
 
+def copy_to_shared_memory(data: Any):
+  r""" Copy all cpu tensors contained by the input data into new shared memory.
+
+  Unlike ``share_memory``, tensors whose storages are already reported as
+  shared are also copied, e.g. the ones memory-mapped from files by
+  ``load_tensor`` with ``mmap``, which would otherwise be passed to other
+  processes by their file mappings rather than shared memory.
+  """
+  return apply_to_all_tensor(data, _copy_to_shared_memory)
+
+
+def _copy_to_shared_memory(tensor: torch.Tensor):
+  if tensor.device.type != 'cpu':
+    return tensor
+  return torch.empty(tensor.size(), dtype=tensor.dtype).share_memory_().copy_(
+    tensor)
+
+
 def squeeze(data: Any):
   r""" Squeeze all tensors contained by the input data.
   """
@@ -0,0 +1,220 @@
+# Copyright 2022 Alibaba Group Holding Limited. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import shutil
+import unittest
+
+import torch
+from torch.multiprocessing.reductions import ForkingPickler
+import graphlearn_torch as glt
+from graphlearn_torch.distributed.dist_dataset import (
+  _cat_hetero_feature_cache, _PackedPartitionBook
+)
+from graphlearn_torch.partition import (
+  RangePartitionBook, cat_feature_cache
+)
+from graphlearn_torch.typing import FeaturePartitionData
+
+
+def run_write_shared_dataset(dataset: glt.distributed.DistDataset):
+  # Writes are only visible to the parent process if the tensors are passed
+  # with shared memory rather than private file mappings.
+  dataset.node_labels[0] = -1
+  dataset.node_features.lazy_init_with_ipc_handle()
+  dataset.node_features.feature_tensor[0] = -1
+
+
+class DistDatasetTestCase(unittest.TestCase):
+  def setUp(self):
+    self.dir = 'dist_dataset_ut'
+    self.node_num = 20
+    rows = torch.arange(self.node_num).repeat_interleave(2)
+    cols = (rows + torch.arange(1, 3).repeat(self.node_num)) % self.node_num
+    self.edge_index = torch.stack([rows, cols])
+    self.node_feat = torch.arange(self.node_num).view(-1, 1).repeat(1, 4)
+
+  def tearDown(self):
+    shutil.rmtree(self.dir, ignore_errors=True)
+
+  def _check_share_mmap_loaded_dataset(self, node_feat_dtype, feats_file):
+    glt.partition.RandomPartitioner(
+      self.dir, 2, self.node_num, self.edge_index,
+      node_feat=self.node_feat, node_feat_dtype=node_feat_dtype
+    ).partition()
+    self.assertTrue(os.path.exists(
+      os.path.join(self.dir, 'part0', 'node_feat', feats_file)))
+    label_file = os.path.join(self.dir, 'label.pt')
+    torch.save(torch.arange(self.node_num), label_file)
+
+    dataset = glt.distributed.DistDataset()
+    dataset.load(self.dir, 0, graph_mode='CPU', feature_with_gpu=False,
+                 whole_node_label_file=label_file)
+    feats = dataset.node_features.feature_tensor.clone()
+    self.assertEqual(feats.dtype, node_feat_dtype)
+
+    # the values are round-tripped by sharing and rebuilding the dataset.
+    rebuilt = ForkingPickler.loads(ForkingPickler.dumps(dataset))
+    rebuilt.node_features.lazy_init_with_ipc_handle()
+    self.assertTrue(torch.equal(rebuilt.node_features.feature_tensor, feats))
+    self.assertTrue(torch.equal(rebuilt.node_labels,
+                                torch.arange(self.node_num)))
+    self.assertTrue(torch.equal(rebuilt.node_pb, dataset.node_pb))
+
+    mp_context = torch.multiprocessing.get_context('spawn')
+    w = mp_context.Process(target=run_write_shared_dataset, args=(dataset, ))
+    w.start()
+    w.join()
+    self.assertEqual(w.exitcode, 0)
+
+    self.assertEqual(dataset.node_labels[0].item(), -1)
+    self.assertTrue(torch.equal(dataset.node_labels[1:],
+                                torch.arange(1, self.node_num)))
+    self.assertTrue(torch.all(dataset.node_features.feature_tensor[0] == -1))
+    self.assertTrue(torch.equal(dataset.node_features.feature_tensor[1:],
+                                feats[1:]))
+
+  def test_share_mmap_loaded_dataset(self):
+    # bfloat16 features are saved by `torch.save` rather than as raw tensors.
+    self._check_share_mmap_loaded_dataset(torch.bfloat16, 'feats.pt')
+
+  def test_share_raw_mmap_loaded_dataset(self):
+    # float32 features are saved as raw tensors and memory-mapped by numpy in
+    # copy-on-write mode.
+    self._check_share_mmap_loaded_dataset(torch.float32, 'feats.npy')
+
+  def test_cat_hetero_feature_cache(self):
+    # 'user' and 'item' are cached with duplicated ids in partition 0, 'tag'
+    # has no feature cache and 'topic' has features of another width.
+    ids = {
+      'user': torch.arange(0, 10, 2), 'item': torch.arange(1, 12, 2),
+      'tag': torch.tensor([4, 0, 2]), 'topic': torch.arange(3)
+    }
+    cache_ids = {
+      'user': torch.tensor([1, 2, 9]), 'item': torch.tensor([0, 5]),
+      'tag': None, 'topic': torch.tensor([5])
+    }
+    num_nodes = {'user': 10, 'item': 12, 'tag': 6, 'topic': 6}
+    dims = {'user': 4, 'item': 4, 'tag': 4, 'topic': 2}
+    raw_feat_data, raw_feat_pb = {}, {}
+    for ntype, ntype_ids in ids.items():
+      feats = ntype_ids.view(-1, 1).repeat(1, dims[ntype]).float()
+      cache_feats = None
+      if cache_ids[ntype] is not None:
+        cache_feats = -cache_ids[ntype].view(-1, 1).float()
+        cache_feats = cache_feats.repeat(1, dims[ntype])
+      raw_feat_data[ntype] = FeaturePartitionData(
+        feats, ntype_ids, cache_feats, cache_ids[ntype])
+      pb = torch.ones(num_nodes[ntype], dtype=torch.int64)
+      pb[ntype_ids] = 0
+      raw_feat_pb[ntype] = pb
+
+    cache_ratio, feat_data, feat_id2idx, feat_pb = _cat_hetero_feature_cache(
+      0, raw_feat_data, {k: v.clone() for k, v in raw_feat_pb.items()})
+    self.assertEqual(set(feat_data.keys()), set(ids.keys()))
+    for ntype in ids.keys():
+      expect_ratio, expect_feats, expect_id2idx, expect_pb = cat_feature_cache(
+        0, raw_feat_data[ntype], raw_feat_pb[ntype].clone())
+      self.assertAlmostEqual(cache_ratio[ntype], expect_ratio)
+      self.assertTrue(torch.equal(feat_data[ntype], expect_feats))
+      self.assertTrue(torch.equal(feat_pb[ntype], expect_pb))
+      # only the ids owned by the new feature partition are meaningful.
+      valid_ids = ids[ntype]
+      if cache_ids[ntype] is not None:
+        valid_ids = torch.cat([cache_ids[ntype], valid_ids]).unique()
+      self.assertTrue(torch.equal(feat_id2idx[ntype][valid_ids],
+                                  expect_id2idx[valid_ids]))
+      self.assertTrue(torch.equal(
+        feat_data[ntype][feat_id2idx[ntype][valid_ids]],
+        expect_feats[expect_id2idx[valid_ids]]
+      ))
+    # types without a cache are not copied.
+    self.assertIs(feat_data['tag'], raw_feat_data['tag'].feats)
+
+  def test_share_packed_partition_book(self):
+    node_pb = {
+      'user': torch.tensor([0, 1, 0, 1]), 'item': torch.tensor([1, 1, 0])
+    }
+    u2i, i2u = ('user', 'to', 'item'), ('item', 'to', 'user')
+    # partition books of different kinds can not be packed.
+    edge_pb = {
+      u2i: torch.tensor([0, 1], dtype=torch.int32),
+      i2u: RangePartitionBook(torch.tensor([3, 5]))
+    }
+    dataset = glt.distributed.DistDataset(
+      2, 0, node_pb={k: v.clone() for k, v in node_pb.items()}, edge_pb=edge_pb)
+    ipc_handle = dataset.share_ipc()
+
+    packed = ipc_handle[6]
+    self.assertIsInstance(packed, _PackedPartitionBook)
+    self.assertTrue(packed.flat_pb.is_shared())
+    self.assertTrue(packed.is_packed_from(dataset.node_pb))
+    self.assertNotIsInstance(ipc_handle[7], _PackedPartitionBook)
+    # sharing again reuses the packed partition book.
+    self.assertIs(dataset.share_ipc()[6], packed)
+
+    for rebuilt in (
+      glt.distributed.DistDataset.from_ipc_handle(ipc_handle),
+      ForkingPickler.loads(ForkingPickler.dumps(dataset))
+    ):
+      self.assertEqual(set(rebuilt.node_pb.keys()), set(node_pb.keys()))
+      for ntype, pb in node_pb.items():
+        self.assertTrue(torch.equal(rebuilt.node_pb[ntype], pb))
+      self.assertIs(rebuilt.node_feat_pb, rebuilt.node_pb)
+      self.assertTrue(torch.equal(rebuilt.edge_pb[u2i], edge_pb[u2i]))
+      self.assertIsInstance(rebuilt.edge_pb[i2u], RangePartitionBook)
+      self.assertTrue(torch.equal(rebuilt.edge_pb[i2u][torch.arange(5)],
+                                  torch.tensor([0, 0, 0, 1, 1])))
+      # the rebuilt dataset shares its packed partition book again as is.
+      self.assertTrue(isinstance(rebuilt.share_ipc()[6], _PackedPartitionBook))
+      self.assertTrue(rebuilt._packed_pbs['node_pb'].is_packed_from(
+        rebuilt.node_pb))
+
+    # the unpacked partition books are views of the shared flat tensor.
+    dataset.node_pb['item'][0] = 0
+    self.assertEqual(packed.unpack()['item'][0].item(), 0)
+
+  def test_share_aliased_feature_partition_book(self):
+    node_pb = {
+      'user': torch.tensor([0, 1, 0, 1]), 'item': torch.tensor([1, 1, 0])
+    }
+    # 'user' has no feature cache, thus its feature partition book is the
+    # same tensor as the graph partition book.
+    node_feat_pb = {'user': node_pb['user'], 'item': torch.tensor([0, 1, 0])}
+    dataset = glt.distributed.DistDataset(
+      2, 0, node_pb=node_pb, node_feat_pb=node_feat_pb)
+    ipc_handle = dataset.share_ipc()
+
+    packed_feat_pb = ipc_handle[8]
+    self.assertIsInstance(packed_feat_pb, _PackedPartitionBook)
+    self.assertEqual(packed_feat_pb.aliases, {'user'})
+    # only the feature partition book of 'item' is packed again.
+    self.assertEqual(packed_feat_pb.flat_pb.numel(), 3)
+    self.assertIs(dataset.node_feat_pb['user'], dataset.node_pb['user'])
+    self.assertIs(dataset.share_ipc()[8], packed_feat_pb)
+
+    rebuilt = ForkingPickler.loads(ForkingPickler.dumps(dataset))
+    self.assertEqual(rebuilt.node_feat_pb['user'].data_ptr(),
+                     rebuilt.node_pb['user'].data_ptr())
+    self.assertTrue(torch.equal(rebuilt.node_feat_pb['user'],
+                                torch.tensor([0, 1, 0, 1])))
+    self.assertTrue(torch.equal(rebuilt.node_feat_pb['item'],
+                                torch.tensor([0, 1, 0])))
+    self.assertTrue(torch.equal(rebuilt.node_pb['item'],
+                                torch.tensor([1, 1, 0])))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -170,6 +170,83 @@ def run_test_as_worker(world_size: int, rank: int,
   dist_loader.shutdown()
 
 
+def run_non_blocking_test_as_worker(world_size: int, rank: int,
+                                    master_port: int, sampling_master_port: int,
+                                    dataset: glt.distributed.DistDataset,
+                                    input_nodes: glt.InputNodes, check_fn):
+  glt.distributed.init_worker_group(
+    world_size, rank, 'dist-neighbor-loader-non-blocking-test'
+  )
+  glt.distributed.init_rpc(
+    master_addr='localhost',
+    master_port=master_port,
+    num_rpc_threads=1,
+    rpc_timeout=30
+  )
+
+  # messages received from a pinned channel are copied to cuda asynchronously.
+  worker_options = glt.distributed.MpDistSamplingWorkerOptions(
+    num_workers=sampling_nprocs,
+    worker_devices=[torch.device('cuda', i % device_num)
+                    for i in range(sampling_nprocs)],
+    worker_concurrency=2,
+    master_addr='localhost',
+    master_port=sampling_master_port,
+    rpc_timeout=10,
+    num_rpc_threads=2,
+    pin_memory=True
+  )
+  dist_loader = glt.distributed.DistNeighborLoader(
+    data=dataset,
+    num_neighbors=[2, 2],
+    input_nodes=input_nodes,
+    batch_size=5,
+    shuffle=True,
+    drop_last=False,
+    with_edge=True,
+    collect_features=True,
+    to_device=torch.device('cuda', rank % device_num),
+    worker_options=worker_options
+  )
+  tc = unittest.TestCase()
+  tc.assertTrue(dist_loader._non_blocking)
+
+  # the last received message is kept until its copies are finished, and is
+  # released when the epoch ends.
+  results = []
+  it = iter(dist_loader)
+  while True:
+    try:
+      results.append(next(it))
+    except StopIteration:
+      break
+    tc.assertTrue(dist_loader._pending_msg is not None)
+  tc.assertTrue(dist_loader._pending_msg is None)
+  tc.assertEqual(len(results), dist_loader._num_expected)
+  # batches are checked after all messages are received, thus they must not
+  # be views of reused channel buffers.
+  torch.cuda.synchronize()
+  for res in results:
+    check_fn(res)
+  glt.distributed.barrier()
+
+  # the pending message is also released when re-iterating without reaching
+  # the end of the previous epoch.
+  it = iter(dist_loader)
+  for _ in range(dist_loader._num_expected):
+    check_fn(next(it))
+  tc.assertTrue(dist_loader._pending_msg is not None)
+  glt.distributed.barrier()
+  it = iter(dist_loader)
+  tc.assertTrue(dist_loader._pending_msg is None)
+  for res in it:
+    check_fn(res)
+  tc.assertTrue(dist_loader._pending_msg is None)
+  glt.distributed.barrier()
+
+  dist_loader.shutdown()
+
+
 def run_test_as_server(num_servers: int, num_clients: int, server_rank: int,
                        master_port: int, dataset: glt.distributed.DistDataset):
   print(f'[Server {server_rank}] Initializing server ...')
@@ -298,6 +375,28 @@ class DistNeighborLoaderTestCase(unittest.TestCase):
     w0.join()
     w1.join()
 
+  def test_homo_mp_non_blocking(self):
+    print("\n--- DistNeighborLoader Test (homogeneous, non-blocking copy) ---")
+    master_port = glt.utils.get_free_port()
+    sampling_master_port = glt.utils.get_free_port()
+    mp_context = torch.multiprocessing.get_context('spawn')
+    w0 = mp_context.Process(
+      target=run_non_blocking_test_as_worker,
+      args=(2, 0, master_port, sampling_master_port,
+            self.dataset0, self.input_nodes0, _check_sample_result)
+    )
+    w1 = mp_context.Process(
+      target=run_non_blocking_test_as_worker,
+      args=(2, 1, master_port, sampling_master_port,
+            self.dataset1, self.input_nodes1, _check_sample_result)
+    )
+    w0.start()
+    w1.start()
+    w0.join()
+    w1.join()
+    self.assertEqual(w0.exitcode, 0)
+    self.assertEqual(w1.exitcode, 0)
+
   def test_hetero_collocated(self):
     print("\n--- DistNeighborLoader Test (heterogeneous, collocated) ---")
     master_port = glt.utils.get_free_port()
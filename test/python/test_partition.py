@@ -13,13 +13,47 @@
 # limitations under the License.
 # ==============================================================================
 
+import os
+import pickle
 import shutil
 import unittest
 
 import torch
 
+from graphlearn_torch.data import CSRTopo, Feature, Graph
+from graphlearn_torch.distributed import DistFeature, DistGraph
 from graphlearn_torch.typing import *
 from graphlearn_torch.partition import *
+from graphlearn_torch.utils import id2idx
+
+
+class RangePartitioner(PartitionerBase):
+  r""" Partitioner which assigns a contiguous range of node ids to each
+  partition.
+  """
+  def _partition_node(self, ntype=None):
+    node_num = self.num_nodes[ntype] if ntype is not None else self.num_nodes
+    ids = torch.arange(node_num, dtype=torch.int64)
+    partition_book = ids * self.num_parts // node_num
+    return [ids[partition_book == pidx] for pidx in range(self.num_parts)], \
+      partition_book
+
+  def _cache_node(self, ntype=None):
+    return [None for _ in range(self.num_parts)]
+
+
+class CachedRangePartitioner(RangePartitioner):
+  r""" Range partitioner which caches the first node of the next partition
+  for the 'user' node type.
+  """
+  def _cache_node(self, ntype=None):
+    if ntype != 'user':
+      return super()._cache_node(ntype)
+    node_num = self.num_nodes[ntype]
+    return [
+      torch.tensor([(pidx + 1) * node_num // self.num_parts % node_num])
+      for pidx in range(self.num_parts)
+    ]
 
 
 class PartitionTestCase(unittest.TestCase):
@@ -60,7 +94,7 @@ class PartitionTestCase(unittest.TestCase):
       self.assertTrue(torch.equal(torch.sort(node_ids)[0],
                                   torch.sort(p_node_feat.ids)[0]))
 
-      expect_node_pids = torch.ones(5, dtype=torch.int64) * pidx
+      expect_node_pids = torch.ones(5, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(node_pb[node_ids], expect_node_pids))
 
       self.assertEqual(p_node_feat.feats.size(0), 5)
@@ -77,7 +111,7 @@ class PartitionTestCase(unittest.TestCase):
       self.assertTrue(torch.equal(torch.sort(edge_ids)[0],
                                   torch.sort(p_edge_feat.ids)[0]))
 
-      expect_edge_pids = torch.ones(10, dtype=torch.int64) * pidx
+      expect_edge_pids = torch.ones(10, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(edge_pb[edge_ids], expect_edge_pids))
 
       self.assertEqual(p_edge_feat.feats.size(0), 10)
@@ -88,6 +122,17 @@ class PartitionTestCase(unittest.TestCase):
       for idx, e_id in enumerate(p_edge_feat.ids):
         self.assertTrue(torch.equal(p_edge_feat.feats[idx], edge_feat[e_id]))
 
+      # mmap
+      _, _, m_graph, m_node_feat, m_edge_feat, m_node_pb, m_edge_pb = \
+        load_partition(dir, pidx, mmap=True)
+      self.assertTrue(torch.equal(m_graph.edge_index[0], p_graph.edge_index[0]))
+      self.assertTrue(torch.equal(m_graph.edge_index[1], p_graph.edge_index[1]))
+      self.assertTrue(torch.equal(m_graph.eids, p_graph.eids))
+      self.assertTrue(torch.equal(m_node_feat.feats, p_node_feat.feats))
+      self.assertTrue(torch.equal(m_edge_feat.ids, p_edge_feat.ids))
+      self.assertTrue(torch.equal(m_node_pb, node_pb))
+      self.assertTrue(torch.equal(m_edge_pb, edge_pb))
+
     shutil.rmtree(dir)
 
   def test_random_hetero_partition(self):
@@ -144,7 +189,7 @@ class PartitionTestCase(unittest.TestCase):
       self.assertTrue(torch.equal(torch.sort(user_ids)[0],
                                   torch.sort(p_node_feat_dict['user'].ids)[0]))
 
-      expect_user_pids = torch.ones(5, dtype=torch.int64) * pidx
+      expect_user_pids = torch.ones(5, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(node_pb_dict['user'][user_ids],
                                   expect_user_pids))
 
@@ -163,7 +208,7 @@ class PartitionTestCase(unittest.TestCase):
       self.assertTrue(torch.equal(torch.sort(item_ids)[0],
                                   torch.sort(p_node_feat_dict['item'].ids)[0]))
 
-      expect_item_pids = torch.ones(3, dtype=torch.int64) * pidx
+      expect_item_pids = torch.ones(3, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(node_pb_dict['item'][item_ids],
                                   expect_item_pids))
 
@@ -180,7 +225,7 @@ class PartitionTestCase(unittest.TestCase):
       p_u2i_eids = p_graph_dict[u2i_type].eids
       self.assertEqual(p_u2i_eids.size(0), 10)
 
-      expect_u2i_pids = torch.ones(10, dtype=torch.long) * pidx
+      expect_u2i_pids = torch.ones(10, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(edge_pb_dict[u2i_type][p_u2i_eids],
                                   expect_u2i_pids))
 
@@ -197,7 +242,7 @@ class PartitionTestCase(unittest.TestCase):
       p_i2i_eids = p_graph_dict[i2i_type].eids
       self.assertEqual(p_i2i_eids.size(0), 6)
 
-      expect_i2i_pids = torch.ones(6, dtype=torch.long) * pidx
+      expect_i2i_pids = torch.ones(6, dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(edge_pb_dict[i2i_type][p_i2i_eids],
                                   expect_i2i_pids))
 
@@ -248,7 +293,7 @@ class PartitionTestCase(unittest.TestCase):
                                   torch.sort(p_node_feat.ids)[0]))
       all_node_ids.append(node_ids)
 
-      expect_node_pids = torch.ones(node_ids.size(0), dtype=torch.int64) * pidx
+      expect_node_pids = torch.ones(node_ids.size(0), dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(node_pb[node_ids], expect_node_pids))
 
       self.assertTrue(p_node_feat.cache_feats is not None)
@@ -265,7 +310,7 @@ class PartitionTestCase(unittest.TestCase):
                                   torch.sort(p_edge_feat.ids)[0]))
       all_edge_ids.append(edge_ids)
 
-      expect_edge_pids = torch.ones(edge_ids.size(0), dtype=torch.int64) * pidx
+      expect_edge_pids = torch.ones(edge_ids.size(0), dtype=torch.uint8) * pidx
       self.assertTrue(torch.equal(edge_pb[edge_ids], expect_edge_pids))
 
       self.assertTrue(p_edge_feat.cache_feats is None)
@@ -280,6 +325,246 @@ class PartitionTestCase(unittest.TestCase):
 
     shutil.rmtree(dir)
 
+  def test_range_grouped_partition(self):
+    dir = 'range_grouped_partition_ut'
+    nparts = 4
+
+    node_num = 20
+    # edges sorted by their source nodes, thus grouped by partitions.
+    edge_index = self._create_edge_index(node_num, node_num, 2)
+    edge_num = len(edge_index[0])
+    node_feat = torch.stack(
+      [torch.ones(10) * i for i in range(node_num)], dim=0
+    )
+    edge_feat = torch.stack(
+      [torch.ones(2) * i for i in range(edge_num)], dim=0
+    )
+
+    RangePartitioner(dir, nparts, node_num, edge_index, node_feat=node_feat,
+                     edge_feat=edge_feat).partition()
+    self.assertTrue(os.path.exists(os.path.join(dir, 'edge_pb.bounds.npy')))
+    self.assertFalse(os.path.exists(os.path.join(dir, 'edge_pb.npy')))
+
+    for pidx in range(nparts):
+      for mmap in [False, True]:
+        _, _, p_graph, p_node_feat, p_edge_feat, node_pb, edge_pb = \
+          load_partition(dir, pidx, mmap=mmap)
+
+        # edges of each partition own a contiguous range of edge ids.
+        expect_eids = torch.arange(pidx * 10, (pidx + 1) * 10)
+        self.assertTrue(torch.equal(p_graph.eids, expect_eids))
+        self.assertTrue(torch.equal(p_graph.edge_index[0],
+                                    edge_index[0][expect_eids]))
+        self.assertTrue(torch.equal(p_graph.edge_index[1],
+                                    edge_index[1][expect_eids]))
+
+        self.assertTrue(isinstance(edge_pb, RangePartitionBook))
+        self.assertEqual(edge_pb.numel(), edge_num)
+        expect_edge_pids = torch.ones(10, dtype=torch.uint8) * pidx
+        self.assertTrue(torch.equal(edge_pb[expect_eids], expect_edge_pids))
+        self.assertTrue(torch.equal(
+          edge_pb[torch.arange(edge_num)],
+          torch.arange(edge_num, dtype=torch.uint8) // 10
+        ))
+
+        self.assertTrue(torch.equal(p_edge_feat.ids, expect_eids))
+        self.assertTrue(torch.equal(p_edge_feat.feats, edge_feat[expect_eids]))
+        expect_nids = torch.arange(pidx * 5, (pidx + 1) * 5)
+        self.assertTrue(torch.equal(p_node_feat.ids, expect_nids))
+        self.assertTrue(torch.equal(p_node_feat.feats, node_feat[expect_nids]))
+
+      # distributed graph and feature with a range partition book.
+      graph = Graph(CSRTopo(p_graph.edge_index, p_graph.eids), mode='CPU')
+      dist_graph = DistGraph(nparts, pidx, graph, node_pb, edge_pb)
+      self.assertTrue(dist_graph.edge_pb is edge_pb)
+
+      feature = Feature(p_edge_feat.feats, id2idx(p_edge_feat.ids),
+                        with_gpu=False)
+      dist_feature = DistFeature(nparts, pidx, feature, edge_pb,
+                                 local_only=True, device=torch.device('cpu'))
+      eids = torch.tensor([0, pidx * 10, edge_num - 1, pidx * 10 + 9])
+      local_feats, local_index = dist_feature._local_selecting_get(eids)
+      expect_index = torch.nonzero(eids // 10 == pidx).view(-1)
+      self.assertTrue(torch.equal(local_index, expect_index))
+      self.assertTrue(torch.equal(local_feats, edge_feat[eids[expect_index]]))
+
+    shutil.rmtree(dir)
+
+  def test_hetero_partition_bundle(self):
+    dir = 'hetero_partition_bundle_ut'
+    nparts = 4
+
+    # items are only owned by partition 0 and 2.
+    user_num, item_num = 20, 2
+    u2i_type = ('user', 'u2i', 'item')
+    i2i_type = ('item', 'i2i', 'item')
+    edge_index_dict = {
+      u2i_type: torch.stack([torch.arange(user_num),
+                             torch.arange(user_num) % item_num]),
+      i2i_type: torch.tensor([[0, 1], [1, 0]])
+    }
+    node_feat_dict = {
+      'user': torch.arange(user_num * 4, dtype=torch.float).view(-1, 4),
+      'item': -torch.arange(item_num * 4, dtype=torch.float).view(-1, 4)
+    }
+    edge_feat_dict = {
+      u2i_type: torch.arange(user_num * 2, dtype=torch.float).view(-1, 2),
+      i2i_type: -torch.arange(2 * 2, dtype=torch.float).view(-1, 2)
+    }
+    CachedRangePartitioner(
+      dir, nparts, {'user': user_num, 'item': item_num}, edge_index_dict,
+      node_feat=node_feat_dict, edge_feat=edge_feat_dict
+    ).partition()
+
+    # empty feature partitions are recorded in META rather than being saved.
+    empty_feats = load_meta(dir)['empty_feats']
+    self.assertEqual(set(empty_feats.keys()),
+                     {'node_feat/item', f'edge_feat/{as_str(i2i_type)}'})
+    for record in empty_feats.values():
+      self.assertEqual(record['parts'], [1, 3])
+      self.assertEqual(record['dtype'], 'float32')
+    self.assertEqual(empty_feats['node_feat/item']['shape'], [4])
+    self.assertEqual(
+      empty_feats[f'edge_feat/{as_str(i2i_type)}']['shape'], [2])
+
+    for pidx in range(nparts):
+      part_dir = os.path.join(dir, f'part{pidx}')
+      # ids of all types are bundled, feature tensors and edge ids are not.
+      bundle = torch.load(os.path.join(part_dir, 'data.pt'))
+      self.assertIn('node_feat/user/ids', bundle)
+      self.assertIn('node_feat/user/cache_ids', bundle)
+      self.assertNotIn('node_feat/user/feats', bundle)
+      self.assertNotIn('node_feat/user/cache_feats', bundle)
+      self.assertNotIn(f'edge_feat/{as_str(u2i_type)}/ids', bundle)
+      self.assertFalse(os.path.exists(
+        os.path.join(part_dir, 'node_feat', 'user', 'data.pt')))
+      self.assertTrue(os.path.exists(
+        os.path.join(part_dir, 'node_feat', 'user', 'cache_feats.npy')))
+      self.assertEqual(
+        os.path.exists(os.path.join(part_dir, 'node_feat', 'item')),
+        pidx % 2 == 0
+      )
+
+      for mmap in [False, True]:
+        (
+          _, _,
+          p_graph_dict, p_node_feat_dict, p_edge_feat_dict, _, _
+        ) = load_partition(dir, pidx, mmap=mmap)
+
+        # user features and caches.
+        p_user = p_node_feat_dict['user']
+        expect_user_ids = torch.arange(pidx * 5, (pidx + 1) * 5)
+        expect_cache_ids = torch.tensor([(pidx + 1) * 5 % user_num])
+        self.assertTrue(torch.equal(p_user.ids, expect_user_ids))
+        self.assertTrue(torch.equal(p_user.feats,
+                                    node_feat_dict['user'][expect_user_ids]))
+        self.assertTrue(torch.equal(p_user.cache_ids, expect_cache_ids))
+        self.assertTrue(torch.equal(p_user.cache_feats,
+                                    node_feat_dict['user'][expect_cache_ids]))
+
+        # item features, empty ones are restored from META.
+        p_item = p_node_feat_dict['item']
+        expect_item_ids = (torch.tensor([pidx // 2]) if pidx % 2 == 0
+                           else torch.empty(0, dtype=torch.int64))
+        self.assertTrue(torch.equal(p_item.ids, expect_item_ids))
+        self.assertTrue(torch.equal(p_item.feats,
+                                    node_feat_dict['item'][expect_item_ids]))
+        self.assertEqual(p_item.feats.dtype, torch.float)
+        self.assertTrue(p_item.cache_feats is None)
+        self.assertTrue(p_item.cache_ids is None)
+
+        # edge feature ids are restored from graph eids.
+        for etype in [u2i_type, i2i_type]:
+          eids = p_graph_dict[etype].eids
+          p_edge_feat = p_edge_feat_dict[etype]
+          self.assertTrue(torch.equal(p_edge_feat.ids, eids))
+          self.assertTrue(torch.equal(p_edge_feat.feats,
+                                      edge_feat_dict[etype][eids]))
+        self.assertEqual(p_graph_dict[i2i_type].eids.numel(),
+                         1 if pidx % 2 == 0 else 0)
+
+    shutil.rmtree(dir)
+
+  def test_load_legacy_partition(self):
+    # partitions saved by earlier versions, with pickled META and one file
+    # saved by `torch.save` for each tensor.
+    dir = 'legacy_partition_ut'
+    u2i_type = ('user', 'u2i', 'item')
+
+    def save_legacy(path, data):
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      torch.save(data, path)
+
+    def save_legacy_partition(root_dir, graph_type=None):
+      sub = [as_str(graph_type)] if graph_type is not None else []
+      with open(os.path.join(root_dir, 'META'), 'wb') as outfile:
+        pickle.dump({
+          'num_parts': 1,
+          'data_cls': 'hetero' if graph_type is not None else 'homo',
+          'node_types': ['user', 'item'] if graph_type is not None else None,
+          'edge_types': [graph_type] if graph_type is not None else None
+        }, outfile, pickle.HIGHEST_PROTOCOL)
+      if graph_type is not None:
+        for ntype in ['user', 'item']:
+          save_legacy(os.path.join(root_dir, 'node_pb', f'{ntype}.pt'),
+                      torch.zeros(4, dtype=torch.int8))
+        save_legacy(
+          os.path.join(root_dir, 'edge_pb', f'{as_str(graph_type)}.pt'),
+          torch.zeros(3, dtype=torch.int8)
+        )
+      else:
+        save_legacy(os.path.join(root_dir, 'node_pb.pt'),
+                    torch.zeros(4, dtype=torch.int8))
+        save_legacy(os.path.join(root_dir, 'edge_pb.pt'),
+                    torch.zeros(3, dtype=torch.int8))
+      part_dir = os.path.join(root_dir, 'part0')
+      graph_dir = os.path.join(part_dir, 'graph', *sub)
+      save_legacy(os.path.join(graph_dir, 'rows.pt'), torch.tensor([0, 1, 2]))
+      save_legacy(os.path.join(graph_dir, 'cols.pt'), torch.tensor([1, 2, 3]))
+      save_legacy(os.path.join(graph_dir, 'eids.pt'), torch.tensor([0, 1, 2]))
+      ntype_sub = ['user'] if graph_type is not None else []
+      node_feat_dir = os.path.join(part_dir, 'node_feat', *ntype_sub)
+      save_legacy(os.path.join(node_feat_dir, 'feats.pt'),
+                  torch.arange(8, dtype=torch.float).view(4, 2))
+      save_legacy(os.path.join(node_feat_dir, 'ids.pt'), torch.arange(4))
+      save_legacy(os.path.join(node_feat_dir, 'cache_feats.pt'),
+                  torch.ones(1, 2))
+      save_legacy(os.path.join(node_feat_dir, 'cache_ids.pt'),
+                  torch.tensor([1]))
+      edge_feat_dir = os.path.join(part_dir, 'edge_feat', *sub)
+      save_legacy(os.path.join(edge_feat_dir, 'feats.pt'),
+                  torch.arange(3, dtype=torch.float).view(3, 1))
+      save_legacy(os.path.join(edge_feat_dir, 'ids.pt'), torch.arange(3))
+
+    for graph_type in [None, u2i_type]:
+      save_legacy_partition(dir, graph_type)
+      for mmap in [False, True]:
+        (
+          num_parts, pidx, graph, node_feat, edge_feat, node_pb, edge_pb
+        ) = load_partition(dir, 0, mmap=mmap)
+        self.assertEqual((num_parts, pidx), (1, 0))
+        if graph_type is not None:
+          self.assertEqual(set(node_pb.keys()), {'user', 'item'})
+          self.assertTrue('item' not in node_feat)
+          graph, node_feat, edge_feat = \
+            graph[graph_type], node_feat['user'], edge_feat[graph_type]
+          node_pb, edge_pb = node_pb['user'], edge_pb[graph_type]
+        self.assertTrue(torch.equal(node_pb, torch.zeros(4, dtype=torch.int8)))
+        self.assertTrue(torch.equal(edge_pb, torch.zeros(3, dtype=torch.int8)))
+        rows, cols = graph.edge_index
+        self.assertTrue(torch.equal(rows, torch.tensor([0, 1, 2])))
+        self.assertTrue(torch.equal(cols, torch.tensor([1, 2, 3])))
+        self.assertTrue(torch.equal(graph.eids, torch.tensor([0, 1, 2])))
+        self.assertTrue(torch.equal(
+          node_feat.feats, torch.arange(8, dtype=torch.float).view(4, 2)))
+        self.assertTrue(torch.equal(node_feat.ids, torch.arange(4)))
+        self.assertTrue(torch.equal(node_feat.cache_feats, torch.ones(1, 2)))
+        self.assertTrue(torch.equal(node_feat.cache_ids, torch.tensor([1])))
+        self.assertTrue(torch.equal(
+          edge_feat.feats, torch.arange(3, dtype=torch.float).view(3, 1)))
+        self.assertTrue(torch.equal(edge_feat.ids, torch.arange(3)))
+      shutil.rmtree(dir)
+
   def test_cat_feature_cache(self):
     feat_pdata = FeaturePartitionData(
       feats=torch.rand(4, 10),